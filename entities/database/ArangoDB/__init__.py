@@ -1,21 +1,42 @@
-from asyncio import get_event_loop
 from ..ArangoDB.connection_pool_arango import ArangoDBPool
+from ..ArangoDB.adjacency import AdjacencyIndex
+from ..ArangoDB.database_arango import ArangoModelEntity
 from ...config import (
     db_name_arango as db_name,
     db_username_arango as db_username,
     db_pass_arango as db_pass,
     db_host_arango as db_hosts,
-    db_pool_size_arango as pool_size
+    db_pool_size_arango as pool_size,
+    db_pool_min_size_arango as pool_min_size,
+    db_pool_acquire_timeout_arango as pool_acquire_timeout,
+    db_pool_max_idle_time_arango as pool_max_idle_time,
+    db_pool_health_check_interval_arango as pool_health_check_interval,
+    db_adjacency_max_edges_arango as adjacency_max_edges,
+    db_adjacency_max_staleness_arango as adjacency_max_staleness,
+    db_adjacency_refresh_interval_arango as adjacency_refresh_interval,
+    db_adjacency_server_id_arango as adjacency_server_id,
 )
 
+# Соединения открываются при первом обращении, а не при импорте
 pool = ArangoDBPool(
     db_name=db_name, 
     username=db_username, 
     password=db_pass, 
     hosts=db_hosts, 
     pool_size=pool_size,
+    min_size=pool_min_size,
+    acquire_timeout=pool_acquire_timeout,
+    max_idle_time=pool_max_idle_time,
+    health_check_interval=pool_health_check_interval,
 )
 
-loop = get_event_loop()
-loop.create_task(pool.initialize_pool()
-)
+# Модель графа веб-процесса: индекс смежности загружается фоном при первом get_neighbors
+model = ArangoModelEntity(pool)
+if adjacency_max_edges:
+    model.adjacency = AdjacencyIndex(
+        model,
+        max_edges=adjacency_max_edges,
+        max_staleness=adjacency_max_staleness,
+        refresh_interval=adjacency_refresh_interval,
+        server_id=adjacency_server_id,
+    )
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aioarango.exceptions import ArangoError
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ("outbound", "inbound", "any")
+
+# Типы записей WAL ArangoDB (/_api/wal/tail)
+WAL_DOCUMENT = 2300
+WAL_REMOVE = 2302
+# Удаление и очистка коллекции: изменения отдельных рёбер в WAL не попадают
+WAL_COLLECTION_RESET = (2001, 2004)
+
+
+class AdjacencyIndex:
+    def __init__(self, model, max_edges: int = 1_000_000, max_staleness: float = 60.0,
+                 batch_size: int = 10000, refresh_interval: float = 10.0, server_id: Optional[int] = None):
+        """
+        Индекс смежности коллекции рёбер в памяти процесса.
+
+        Идентификаторы вершин интернируются в целые числа, списки исходящих и
+        входящих соседей хранятся в array('I') — около 8 байт на ребро против
+        сотен байт на документ ребра. Первая загрузка читает _key, _rev, _from
+        и _to всех рёбер и запоминает тик WAL; дальнейшие обновления читают
+        только изменения после этого тика через /_api/wal/tail. Если WAL
+        недоступен или нужные записи уже удалены сервером, индекс загружается
+        заново целиком.
+
+        Обновление запускается фоновой задачей при первом обращении
+        (ensure_running) и повторяется раз в refresh_interval секунд.
+
+        Индекс считается холодным до первой загрузки, после превышения
+        max_edges и если с последнего обновления прошло больше max_staleness
+        секунд — тогда ArangoModelEntity.get_neighbors выполняет AQL-запрос.
+
+        :param model: ArangoModelEntity, через которую читаются рёбра.
+        :param max_edges: Максимальное количество рёбер в памяти.
+        :param max_staleness: Сколько секунд после обновления индекс отвечает на запросы.
+        :param batch_size: Размер порции курсора при полной загрузке.
+        :param refresh_interval: Пауза между обновлениями в секундах.
+        :param server_id: Идентификатор клиента WAL (положительное число): сервер
+                          хранит для него записи WAL, пока они не прочитаны.
+        """
+        self.model = model
+        self.max_edges = max_edges
+        self.max_staleness = max_staleness
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        self.server_id = server_id
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.clear()
+
+    def clear(self):
+        """Сбрасывает индекс в холодное состояние."""
+        self._ids: List[str] = []
+        self._numbers: Dict[str, int] = {}
+        self._out: List[array] = []
+        self._in: List[array] = []
+        # _key ребра -> (_rev, номер начала, номер конца)
+        self._edges: Dict[str, Tuple[str, int, int]] = {}
+        self._refreshed_at: Optional[float] = None
+        # Позиция в WAL, с которой продолжается чтение изменений (None — нужна полная загрузка)
+        self._tick: Optional[str] = None
+        self._last_scanned = "0"
+        self._collection_id: Optional[str] = None
+
+    @property
+    def is_warm(self) -> bool:
+        return self._refreshed_at is not None and time.monotonic() - self._refreshed_at <= self.max_staleness
+
+    @property
+    def edges_count(self) -> int:
+        return len(self._edges)
+
+    def _intern(self, vertex_id: str) -> int:
+        number = self._numbers.get(vertex_id)
+        if number is None:
+            number = len(self._ids)
+            self._numbers[vertex_id] = number
+            self._ids.append(vertex_id)
+            self._out.append(array("I"))
+            self._in.append(array("I"))
+        return number
+
+    def _add(self, key: str, rev: str, from_id: str, to_id: str):
+        source, target = self._intern(from_id), self._intern(to_id)
+        self._edges[key] = (rev, source, target)
+        self._out[source].append(target)
+        self._in[target].append(source)
+
+    def _remove(self, key: str):
+        _, source, target = self._edges.pop(key)
+        self._out[source].remove(target)
+        self._in[target].remove(source)
+
+    def apply_edge(self, key: str, rev: str, from_id: str, to_id: str):
+        """Учитывает ребро, записанное этим процессом, не дожидаясь обновления."""
+        if self._refreshed_at is None or len(self._edges) >= self.max_edges:
+            return
+        current = self._edges.get(key)
+        if current is not None:
+            if current[0] == rev:
+                return
+            self._remove(key)
+        self._add(key, rev, from_id, to_id)
+
+    def _compact(self):
+        """Перестраивает индекс без вершин, у которых не осталось рёбер."""
+        edges = [(key, rev, self._ids[source], self._ids[target]) for key, (rev, source, target) in self._edges.items()]
+        state = (self._refreshed_at, self._tick, self._last_scanned, self._collection_id)
+        self.clear()
+        for edge in edges:
+            self._add(*edge)
+        self._refreshed_at, self._tick, self._last_scanned, self._collection_id = state
+
+    def _apply(self, key: str, rev: str, from_id: str, to_id: str, stats: Dict[str, int]):
+        current = self._edges.get(key)
+        if current is not None:
+            if current[0] == rev:
+                return
+            self._remove(key)
+            stats["updated"] += 1
+        else:
+            stats["added"] += 1
+        self._add(key, rev, from_id, to_id)
+
+    async def refresh(self) -> Optional[Dict[str, int]]:
+        """
+        Синхронизирует индекс с коллекцией рёбер.
+
+        Запросы к индексу во время обновления видят смесь старых и новых
+        рёбер; свежесть отсчитывается от начала обновления.
+
+        :return: Словарь с ключами 'added', 'updated', 'removed' или None,
+                 если рёбер больше max_edges (индекс остается холодным).
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            started_at = time.monotonic()
+            stats = None
+            if self._tick is not None:
+                try:
+                    stats = await self._tail()
+                except ArangoError as e:
+                    logger.warning(f"Не удалось прочитать WAL, индекс смежности загружается заново: {str(e)}")
+            if stats is None:
+                stats = await self._reload()
+            if stats is None:
+                return None
+            if len(self._ids) > 2 * len(self._edges) + 1024:
+                self._compact()
+            self._refreshed_at = started_at
+            return stats
+
+    async def _reload(self) -> Optional[Dict[str, int]]:
+        """Полная загрузка рёбер с запоминанием тика WAL перед чтением."""
+        tick = None
+        async with self.model.pool.acquire() as conn:
+            try:
+                tick = (await conn.wal.last_tick())["tick"]
+                self._collection_id = (await conn.collection(self.model.edges_name).properties())["global_id"]
+            except (ArangoError, KeyError) as e:
+                logger.warning(f"WAL недоступен, индекс смежности будет загружаться целиком: {str(e)}")
+
+        query = "FOR e IN @@edges RETURN [e._key, e._rev, e._from, e._to]"
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        seen: Set[str] = set()
+        async for key, rev, from_id, to_id in self.model._stream_query(
+            query, {"@edges": self.model.edges_name}, self.batch_size, "Ошибка загрузки рёбер"
+        ):
+            seen.add(key)
+            if len(seen) > self.max_edges:
+                logger.warning(f"Рёбер больше {self.max_edges}, индекс смежности отключен")
+                self.clear()
+                return None
+            self._apply(key, rev, from_id, to_id, stats)
+
+        for key in [key for key in self._edges if key not in seen]:
+            self._remove(key)
+            stats["removed"] += 1
+        # Изменения во время загрузки будут прочитаны из WAL повторно: применение идемпотентно по _rev
+        self._tick, self._last_scanned = tick, "0"
+        return stats
+
+    async def _tail(self) -> Optional[Dict[str, int]]:
+        """
+        Применяет изменения коллекции рёбер из WAL после сохраненного тика.
+
+        :return: Статистика или None, если нужна полная загрузка.
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        async with self.model.pool.acquire() as conn:
+            while True:
+                result = await conn.wal.tail(
+                    lower=self._tick, last_scanned=self._last_scanned, server_id=self.server_id,
+                    client_info="adjacency-index", deserialize=True,
+                )
+                if not result.get("from_present", True):
+                    # Сервер уже удалил часть записей после нашего тика
+                    return None
+                for entry in result["content"]:
+                    if entry.get("cuid") != self._collection_id and entry.get("cname") != self.model.edges_name:
+                        continue
+                    data = entry.get("data") or {}
+                    if entry.get("type") == WAL_DOCUMENT:
+                        self._apply(data["_key"], data["_rev"], data["_from"], data["_to"], stats)
+                    elif entry.get("type") == WAL_REMOVE:
+                        if data.get("_key") in self._edges:
+                            self._remove(data["_key"])
+                            stats["removed"] += 1
+                    elif entry.get("type") in WAL_COLLECTION_RESET:
+                        return None
+                    if len(self._edges) > self.max_edges:
+                        return None
+
+                if result.get("last_included", "0") != "0":
+                    self._tick = result["last_included"]
+                self._last_scanned = result.get("last_scanned", self._last_scanned)
+                if not result.get("check_more"):
+                    return stats
+
+    def ensure_running(self):
+        """Запускает фоновое обновление в текущем event loop, если оно ещё не запущено."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self.run())
+
+    async def run(self, stop: Optional[asyncio.Event] = None, interval: Optional[float] = None):
+        """Обновляет индекс каждые interval (по умолчанию refresh_interval) секунд до установки stop."""
+        stop = stop or asyncio.Event()
+        interval = interval if interval is not None else self.refresh_interval
+        while not stop.is_set():
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Ошибка обновления индекса смежности: {str(e)}")
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _neighbors(self, number: int, direction: str) -> List[int]:
+        if direction == "outbound":
+            return list(self._out[number])
+        if direction == "inbound":
+            return list(self._in[number])
+        return list(self._out[number]) + list(self._in[number])
+
+    def lookup(self, vertex_id: str, max_depth: int = 1, direction: str = "outbound") -> List[Dict[str, Any]]:
+        """
+        Соседи вершины на расстоянии 1 или 2 (обход в ширину, каждая вершина один раз).
+
+        :param vertex_id: _id начальной вершины.
+        :param max_depth: 1 или 2.
+        :param direction: "outbound", "inbound" или "any".
+        :return: Список словарей с ключами 'id' и 'depth' — как у AQL-запроса в get_neighbors.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Недопустимое направление обхода: {direction}")
+        if max_depth not in (1, 2):
+            raise ValueError("Индекс смежности поддерживает глубину 1 или 2")
+        start = self._numbers.get(vertex_id)
+        if start is None:
+            return []
+
+        visited = {start}
+        result = []
+        frontier = [start]
+        for depth in range(1, max_depth + 1):
+            next_frontier = []
+            for number in frontier:
+                for neighbor in self._neighbors(number, direction):
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+                        result.append({"id": self._ids[neighbor], "depth": depth})
+            frontier = next_frontier
+        return result
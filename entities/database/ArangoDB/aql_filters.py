@@ -0,0 +1,47 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+# Операторы фильтра -> оператор AQL
+AQL_OPERATORS = {
+    "eq": "==",
+    "ne": "!=",
+    "lt": "<",
+    "lte": "<=",
+    "gt": ">",
+    "gte": ">=",
+    "in": "IN",
+    "like": "LIKE",
+}
+
+# Направления обхода графа
+TRAVERSAL_DIRECTIONS = {"outbound": "OUTBOUND", "inbound": "INBOUND", "any": "ANY"}
+
+
+def build_aql_conditions(variable: str, filters: Optional[List[Dict[str, Any]]],
+                         prefix: str) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Формирует условия AQL по списку фильтров.
+
+    Имена атрибутов и значения передаются bind-переменными, в текст запроса
+    попадают только имя переменной и оператор из AQL_OPERATORS.
+
+    :param variable: Переменная AQL (например, "v", "e" или "doc").
+    :param filters: Список словарей с ключами 'field' (допускается путь через точку),
+                    'op' (по умолчанию "eq") и 'value'.
+    :param prefix: Префикс имен bind-переменных.
+    :return: Пара (список условий, bind-переменные).
+    """
+    conditions = []
+    bind_vars = {}
+    for i, item in enumerate(filters or []):
+        field, op = item.get("field"), item.get("op", "eq")
+        if not field or not isinstance(field, str):
+            raise ValueError(f"Не указан атрибут фильтра: {item}")
+        if op not in AQL_OPERATORS:
+            raise ValueError(f"Недопустимый оператор фильтра: {op}")
+        if op == "like" and not isinstance(item.get("value"), str):
+            raise ValueError(f"Оператор like требует строку: {field}")
+        conditions.append(f"{variable}.@{prefix}f{i} {AQL_OPERATORS[op]} @{prefix}v{i}")
+        # Путь к вложенному атрибуту передается массивом: "address.city" -> ["address", "city"]
+        bind_vars[f"{prefix}f{i}"] = field.split(".") if "." in field else field
+        bind_vars[f"{prefix}v{i}"] = item.get("value")
+    return conditions, bind_vars
@@ -1,46 +1,212 @@
 import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple
+
 from aioarango import ArangoClient
 from aioarango.database import StandardDatabase
 
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(TimeoutError):
+    """Не удалось получить соединение из пула за acquire_timeout секунд."""
+
+
 class ArangoDBPool:
     def __init__(
         self,
-                db_name: str, 
-                username: str, 
-                password: str, 
+                db_name: str,
+                username: str,
+                password: str,
                 hosts: str,
-                pool_size: int = 500
+                pool_size: int = 500,
+                min_size: int = 1,
+                acquire_timeout: Optional[float] = 5.0,
+                max_idle_time: float = 300.0,
+                health_check_interval: float = 30.0,
+                reap_interval: Optional[float] = None,
         ):
-        self.client = ArangoClient()
+        """
+        Эластичный пул подключений к ArangoDB.
+
+        Соединение пула — StandardDatabase со своим ArangoClient: у каждого
+        клиента отдельная HTTP-сессия, которая закрывается вместе с ним.
+
+        Соединения открываются по требованию: пул растет до pool_size и
+        закрывает простаивающие дольше max_idle_time, не опускаясь ниже
+        min_size; лишние соединения закрывает фоновая задача раз в
+        reap_interval секунд, даже если обращений к пулу больше нет.
+        Соединение, простаивавшее дольше health_check_interval, проверяется
+        перед выдачей; неисправные закрываются и заменяются.
+
+        :param db_name: Имя базы данных.
+        :param username: Имя пользователя.
+        :param password: Пароль.
+        :param hosts: Адрес сервера.
+        :param pool_size: Максимальное количество соединений.
+        :param min_size: Сколько простаивающих соединений держать открытыми.
+        :param acquire_timeout: Максимальное ожидание свободного соединения
+                                в секундах (None — без ограничения).
+        :param max_idle_time: Через сколько секунд простоя закрывать лишние соединения.
+        :param health_check_interval: После скольких секунд простоя проверять
+                                      соединение перед выдачей.
+        :param reap_interval: Как часто закрывать простаивающие соединения
+                              (None — раз в max_idle_time).
+        """
         self.db_name = db_name
         self.username = username
         self.password = password
         self.hosts = hosts
         self.pool_size = pool_size
-        self.pool = asyncio.Queue()
+        self.min_size = min(min_size, pool_size)
+        self.acquire_timeout = acquire_timeout
+        self.max_idle_time = max_idle_time
+        self.health_check_interval = health_check_interval
+        self.reap_interval = reap_interval if reap_interval is not None else max_idle_time
+        # Простаивающие соединения и время их возврата; новые справа
+        self._idle: Deque[Tuple[StandardDatabase, float]] = deque()
+        # Клиент (HTTP-сессия) каждого открытого соединения
+        self._clients: Dict[StandardDatabase, ArangoClient] = {}
+        self._size = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._reaper: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        """Количество открытых соединений (свободных и выданных)."""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        """Количество свободных соединений."""
+        return len(self._idle)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Создается при первом использовании, внутри работающего event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.pool_size)
+        return self._semaphore
 
     async def initialize_pool(self):
-        """Создаёт пул подключений"""
-        for _ in range(self.pool_size):
+        """Открывает min_size соединений заранее (необязательный прогрев)."""
+        while self._size < self.min_size:
             conn = await self.create_connection()
-            await self.pool.put(conn)
+            self._size += 1
+            self._idle.append((conn, time.monotonic()))
 
     async def create_connection(self) -> StandardDatabase:
         """Создаёт новое подключение к базе ArangoDB"""
-        return await self.client.db(
-            self.db_name, username=self.username, password=self.password#, hosts=self.hosts
-        )
+        hosts = self.hosts if "://" in self.hosts else f"http://{self.hosts}"
+        client = ArangoClient(hosts=hosts)
+        try:
+            conn = await client.db(self.db_name, username=self.username, password=self.password)
+        except BaseException:
+            await client.close()
+            raise
+        self._clients[conn] = client
+        return conn
+
+    async def _is_healthy(self, conn: StandardDatabase) -> bool:
+        try:
+            await conn.version()
+            return True
+        except Exception as e:
+            logger.warning(f"Соединение ArangoDB не прошло проверку: {str(e)}")
+            return False
+
+    async def _close_connection(self, conn: StandardDatabase):
+        self._size -= 1
+        client = self._clients.pop(conn, None)
+        if client is None:
+            return
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning(f"Ошибка закрытия соединения ArangoDB: {str(e)}")
+
+    async def _take_idle(self) -> Optional[StandardDatabase]:
+        """Берет самое свежее свободное соединение, проверяя давно простаивавшие."""
+        while self._idle:
+            conn, released_at = self._idle.pop()
+            if time.monotonic() - released_at < self.health_check_interval or await self._is_healthy(conn):
+                return conn
+            await self._close_connection(conn)
+        return None
+
+    async def _shrink_idle(self):
+        """Закрывает соединения, простаивающие дольше max_idle_time, сверх min_size."""
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.max_idle_time:
+            conn, _ = self._idle.popleft()
+            await self._close_connection(conn)
+
+    def _ensure_reaper(self):
+        # Задача привязана к event loop: при смене loop (или после её остановки) запускается заново
+        loop = asyncio.get_running_loop()
+        if self._reaper is None or self._reaper.done() or self._reaper.get_loop() is not loop:
+            self._reaper = loop.create_task(self._reap())
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self._shrink_idle()
+            except Exception as e:
+                logger.warning(f"Ошибка закрытия простаивающих соединений ArangoDB: {str(e)}")
 
     async def get_connection(self) -> StandardDatabase:
-        """Берёт соединение из пула (или ждёт, пока освободится)"""
-        return await self.pool.get()
+        """
+        Берёт соединение из пула, при необходимости открывая новое.
+
+        :raises PoolTimeoutError: Если все pool_size соединений заняты дольше acquire_timeout.
+        """
+        self._ensure_reaper()
+        semaphore = self._get_semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError(
+                f"Нет свободного соединения ArangoDB за {self.acquire_timeout} с (занято {self._size})"
+            )
+
+        try:
+            conn = await self._take_idle()
+            if conn is None:
+                conn = await self.create_connection()
+                self._size += 1
+        except BaseException:
+            semaphore.release()
+            raise
+        return conn
 
     async def release_connection(self, conn: StandardDatabase):
         """Возвращает соединение в пул"""
-        await self.pool.put(conn)
+        self._idle.append((conn, time.monotonic()))
+        self._get_semaphore().release()
+        await self._shrink_idle()
+
+    async def discard_connection(self, conn: StandardDatabase):
+        """Закрывает неисправное соединение вместо возврата в пул."""
+        self._get_semaphore().release()
+        await self._close_connection(conn)
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Контекстный менеджер: async with pool.acquire() as conn."""
+        conn = await self.get_connection()
+        try:
+            yield conn
+        finally:
+            await self.release_connection(conn)
 
     async def close_pool(self):
-        """Закрывает все соединения в пуле"""
-        while not self.pool.empty():
-            conn = await self.pool.get()
-            await conn.close()
\ No newline at end of file
+        """Закрывает все свободные соединения в пуле"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        while self._idle:
+            conn, _ = self._idle.popleft()
+            await self._close_connection(conn)
@@ -1,123 +1,389 @@
-from aioarango.exceptions import DocumentInsertError
+from typing import Any, AsyncIterator, Dict, List, Optional
+from aioarango.exceptions import AQLQueryExecuteError, ArangoServerError, DocumentInsertError
+from aioarango.request import Request
 from .connection_pool_arango import ArangoDBPool as ConnectionPool
+from .aql_filters import TRAVERSAL_DIRECTIONS, build_aql_conditions
+from .adjacency import AdjacencyIndex
 
 from ...config import (DB_PATH_ENTITIES_ARANGO,
                        DB_PATH_EDGES_ARANGO,
                        DB_PATH_GROUPS_ARANGO)
 
+# Режимы overwrite_mode для пакетной вставки (None — ошибка при совпадении _key)
+OVERWRITE_MODES = (None, "ignore", "replace", "update", "conflict")
+
+# Коды ошибок ArangoDB
+ERROR_DOCUMENT_NOT_FOUND = 1202
+ERROR_REVISION_CONFLICT = 1200
+
+
+class RevisionConflictError(ValueError):
+    """Документ изменился: _rev не совпадает с ожидаемым."""
+
 class ArangoModelEntity:
-    def __init__(self, pool: ConnectionPool):
-        """Принимаем пул в качестве аргумента."""
+    def __init__(self, pool: ConnectionPool, adjacency: Optional[AdjacencyIndex] = None):
+        """
+        Принимаем пул в качестве аргумента.
+
+        :param adjacency: Индекс смежности для get_neighbors (None — всегда AQL).
+        """
         self.pool = pool
         self.entities_collection_name = DB_PATH_ENTITIES_ARANGO
         self.groups_collection_name = DB_PATH_GROUPS_ARANGO
         self.edges_name = DB_PATH_EDGES_ARANGO
+        self.adjacency = adjacency
 
     async def create_collection(self, collection_name):
-        conn = await self.pool.get_connection()
-        try:
+        async with self.pool.acquire() as conn:
             if not await conn.has_collection(collection_name):
                 await conn.create_collection(collection_name)
-        finally:
-            await self.pool.release_connection(conn)
 
     async def insert_document(self, document):
         """Вставка документа в коллекцию."""
-        conn = await self.pool.get_connection()
-        try:
-            collection = conn.collection(self.entities_collection_name)
-            return await collection.insert(document)
-        except DocumentInsertError as e:
-            print(f"Ошибка при вставке документа: {e}")
-            return None
-        finally:
-            await self.pool.release_connection(conn)
+        async with self.pool.acquire() as conn:
+            try:
+                collection = conn.collection(self.entities_collection_name)
+                return await collection.insert(document)
+            except DocumentInsertError as e:
+                print(f"Ошибка при вставке документа: {e}")
+                return None
             
     async def create_group(self, document):
-        conn = await self.pool.get_connection()
-        try:
-            collection = conn.collection(self.group)
-            return await collection.insert(document)
-        except DocumentInsertError as e:
-            print(f"Ошибка при вставке документа: {e}")
-            return None
-        finally:
-            await self.pool.release_connection(conn)
+        async with self.pool.acquire() as conn:
+            try:
+                collection = conn.collection(self.groups_collection_name)
+                return await collection.insert(document)
+            except DocumentInsertError as e:
+                print(f"Ошибка при вставке документа: {e}")
+                return None
             
     async def create_entity(self, document):
-        conn = await self.pool.get_connection()
-        try:
-            collection = conn.collection(self.entities_collection_name)
-            return await collection.insert(document)
-        except DocumentInsertError as e:
-            print(f"Ошибка при вставке документа: {e}")
-            return None
-        finally:
-            await self.pool.release_connection(conn)
+        async with self.pool.acquire() as conn:
+            try:
+                collection = conn.collection(self.entities_collection_name)
+                return await collection.insert(document)
+            except DocumentInsertError as e:
+                print(f"Ошибка при вставке документа: {e}")
+                return None
+
+    async def _insert_chunks(self, collection_name: str, documents: List[Dict[str, Any]],
+                             overwrite_mode: Optional[str], chunk_size: int) -> Dict[str, Any]:
+        if overwrite_mode not in OVERWRITE_MODES:
+            raise ValueError(f"Недопустимый режим перезаписи: {overwrite_mode}")
+
+        inserted = 0
+        errors = []
+        async with self.pool.acquire() as conn:
+            collection = conn.collection(collection_name)
+            for start in range(0, len(documents), chunk_size):
+                chunk = documents[start:start + chunk_size]
+                try:
+                    results = await self._insert_request(collection, chunk, overwrite_mode)
+                except ArangoServerError as e:
+                    # Ошибка всего запроса — отмечаем каждую строку пакета
+                    errors += [{"index": start + i, "error": str(e)} for i in range(len(chunk))]
+                    continue
+                for i, result in enumerate(results):
+                    if isinstance(result, Exception):
+                        errors.append({"index": start + i, "error": str(result)})
+                    else:
+                        inserted += 1
+        return {"inserted": inserted, "errors": errors}
+
+    @staticmethod
+    async def _insert_request(collection, documents: List[Dict[str, Any]], overwrite_mode: Optional[str]):
+        """
+        POST /_api/document/<коллекция> с параметром overwriteMode.
+
+        StandardCollection.insert_many в aioarango 1.0.0 знает только флаг overwrite
+        (то же, что "replace"), поэтому запрос формируется так же, как в нём, но с overwriteMode.
+
+        :return: Список метаданных документов и исключений DocumentInsertError — как у insert_many.
+        """
+        params = {"silent": False}
+        if overwrite_mode is not None:
+            params["overwriteMode"] = overwrite_mode
+        request = Request(
+            method="post",
+            endpoint=f"/_api/document/{collection.name}",
+            data=documents,
+            params=params,
+        )
+
+        def response_handler(resp):
+            if not resp.is_success:
+                raise DocumentInsertError(resp, request)
+            return [
+                body if "_id" in body
+                else DocumentInsertError(collection.conn.prep_bulk_err_response(resp, body), request)
+                for body in resp.body
+            ]
+
+        return await collection._execute(request, response_handler)
+
+    async def insert_many(self, documents: List[Dict[str, Any]], collection_name: Optional[str] = None,
+                          overwrite_mode: Optional[str] = None, chunk_size: int = 1000) -> Dict[str, Any]:
+        """
+        Пакетная вставка документов: один HTTP-запрос на chunk_size документов.
+
+        :param documents: Документы для вставки.
+        :param collection_name: Коллекция; по умолчанию коллекция сущностей.
+        :param overwrite_mode: Поведение при совпадении _key: None (ошибка), "ignore",
+                               "replace", "update" или "conflict".
+        :param chunk_size: Количество документов в одном запросе.
+        :return: Словарь с ключами 'inserted' и 'errors' (список {'index', 'error'}
+                 с номером документа во входном списке).
+        """
+        return await self._insert_chunks(
+            collection_name or self.entities_collection_name, documents, overwrite_mode, chunk_size
+        )
+
+    async def create_edges_many(self, edges: List[Dict[str, Any]], edge_collection_name: Optional[str] = None,
+                                overwrite_mode: Optional[str] = None, chunk_size: int = 1000) -> Dict[str, Any]:
+        """
+        Пакетное создание рёбер.
+
+        Концы ребра без имени коллекции ("123" вместо "enitities/123")
+        считаются ключами в коллекции сущностей.
+
+        :param edges: Рёбра с атрибутами _from и _to (и любыми другими).
+        :param edge_collection_name: Рёберная коллекция; по умолчанию коллекция рёбер.
+        :param overwrite_mode: См. insert_many.
+        :param chunk_size: Количество рёбер в одном запросе.
+        :return: Словарь с ключами 'inserted' и 'errors'.
+        """
+        prepared = []
+        invalid = []
+        for i, edge in enumerate(edges):
+            if not edge.get("_from") or not edge.get("_to"):
+                invalid.append({"index": i, "error": "Ребро без _from или _to"})
+                continue
+            prepared.append((i, {
+                **edge,
+                "_from": self._vertex_id(edge["_from"]),
+                "_to": self._vertex_id(edge["_to"]),
+            }))
+
+        result = await self._insert_chunks(
+            edge_collection_name or self.edges_name, [edge for _, edge in prepared], overwrite_mode, chunk_size
+        )
+        # Номера ошибок пересчитываются на позиции во входном списке
+        positions = [i for i, _ in prepared]
+        errors = invalid + [{**error, "index": positions[error["index"]]} for error in result["errors"]]
+        return {"inserted": result["inserted"], "errors": sorted(errors, key=lambda error: error["index"])}
+
+    def _vertex_id(self, vertex: Any) -> str:
+        vertex = str(vertex)
+        return vertex if "/" in vertex else f"{self.entities_collection_name}/{vertex}"
+
+    async def _stream_query(self, query: str, bind_vars: Dict[str, Any], batch_size: int,
+                            error_message: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Выполняет AQL-запрос потоковым курсором и отдает результаты по одному.
+
+        Соединение занято, пока генератор не исчерпан или не закрыт; в памяти
+        держится не больше batch_size результатов.
+        """
+        async with self.pool.acquire() as conn:
+            try:
+                cursor = await conn.aql.execute(query, bind_vars=bind_vars, batch_size=batch_size, stream=True)
+            except AQLQueryExecuteError as e:
+                raise ValueError(f"{error_message}: {e}")
+            try:
+                async for item in cursor:
+                    yield item
+            finally:
+                await cursor.close(ignore_missing=True)
+
+    def iter_documents(self, collection_name: Optional[str] = None, fields: Optional[List[str]] = None,
+                       filters: Optional[List[Dict[str, Any]]] = None, limit: Optional[int] = None,
+                       batch_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Потоковое чтение документов коллекции.
+
+        Фильтры, проекция и LIMIT выполняются в AQL на сервере, результаты
+        приходят порциями по batch_size.
+
+        :param collection_name: Коллекция; по умолчанию коллекция сущностей.
+        :param fields: Возвращаемые атрибуты (None — документ целиком).
+        :param filters: Фильтры (см. build_aql_conditions).
+        :param limit: Максимальное количество документов.
+        :param batch_size: Размер порции курсора.
+        :return: Асинхронный генератор документов.
+        """
+        conditions, bind_vars = build_aql_conditions("doc", filters, "d")
+        bind_vars["@collection"] = collection_name or self.entities_collection_name
+        return self._stream_query(
+            *self._projected_query("doc IN @@collection", conditions, bind_vars, fields, limit),
+            batch_size, "Ошибка чтения документов",
+        )
+
+    def iter_edges(self, edge_collection_name: Optional[str] = None, from_vertex: Optional[str] = None,
+                   to_vertex: Optional[str] = None, fields: Optional[List[str]] = None,
+                   filters: Optional[List[Dict[str, Any]]] = None, limit: Optional[int] = None,
+                   batch_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Потоковое чтение рёбер с отбором по концам (использует edge-индекс).
+
+        :param edge_collection_name: Рёберная коллекция; по умолчанию коллекция рёбер.
+        :param from_vertex: Только рёбра из этой вершины.
+        :param to_vertex: Только рёбра в эту вершину.
+        :param fields: Возвращаемые атрибуты (None — ребро целиком).
+        :param filters: Дополнительные фильтры (см. build_aql_conditions).
+        :param limit: Максимальное количество рёбер.
+        :param batch_size: Размер порции курсора.
+        :return: Асинхронный генератор рёбер.
+        """
+        conditions, bind_vars = build_aql_conditions("doc", filters, "d")
+        bind_vars["@collection"] = edge_collection_name or self.edges_name
+        if from_vertex is not None:
+            conditions.insert(0, "doc._from == @from_vertex")
+            bind_vars["from_vertex"] = self._vertex_id(from_vertex)
+        if to_vertex is not None:
+            conditions.insert(0, "doc._to == @to_vertex")
+            bind_vars["to_vertex"] = self._vertex_id(to_vertex)
+        return self._stream_query(
+            *self._projected_query("doc IN @@collection", conditions, bind_vars, fields, limit),
+            batch_size, "Ошибка чтения рёбер",
+        )
+
+    @staticmethod
+    def _projected_query(source: str, conditions: List[str], bind_vars: Dict[str, Any],
+                         fields: Optional[List[str]], limit: Optional[int]):
+        lines = [f"FOR {source}"]
+        lines += [f"FILTER {condition}" for condition in conditions]
+        if limit is not None:
+            lines.append("LIMIT @limit")
+            bind_vars["limit"] = limit
+        if fields:
+            lines.append("RETURN KEEP(doc, @fields)")
+            bind_vars["fields"] = list(fields)
+        else:
+            lines.append("RETURN doc")
+        return "\n".join(lines), bind_vars
 
     async def get_documents(self):
         """Получение всех документов из коллекции."""
-        conn = await self.pool.get_connection()
-        try:
-            collection = conn.collection(self.entities_collection_name)
-            cursor = await collection.all()
-            return [doc async for doc in cursor]
-        finally:
-            await self.pool.release_connection(conn)
+        return [doc async for doc in self.iter_documents()]
 
     async def get_document_by_id(self, doc_key):
         """Получение документа по ID."""
-        conn = await self.pool.get_connection()
-        try:
+        async with self.pool.acquire() as conn:
             collection = conn.collection(self.entities_collection_name)
             return await collection.get(doc_key)
-        finally:
-            await self.pool.release_connection(conn)
 
-    async def update_document(self, doc_id, update_data):
-        """Обновление документа."""
-        conn = await self.pool.get_connection()
-        try:
-            collection = conn.collection(self.entities_collection_name)
-            doc = await collection.get(doc_id)
-            if doc:
-                doc.update(update_data)
-                return await collection.update(doc)
-            return None
-        finally:
-            await self.pool.release_connection(conn)
+    async def update_document(self, doc_id, update_data, rev: Optional[str] = None,
+                              merge_objects: bool = True, keep_null: bool = True,
+                              collection_name: Optional[str] = None):
+        """
+        Частичное обновление документа одним AQL-запросом на сервере.
+
+        :param doc_id: _key или _id документа.
+        :param update_data: Изменяемые атрибуты.
+        :param rev: Ожидаемый _rev; если документ с тех пор изменился — RevisionConflictError.
+        :param merge_objects: Сливать вложенные объекты (False — заменять целиком).
+        :param keep_null: Сохранять атрибуты со значением null (False — удалять их).
+        :param collection_name: Коллекция; по умолчанию коллекция сущностей.
+        :return: Словарь с ключами '_id', '_key', '_rev', '_old_rev' или None, если документа нет.
+        """
+        selector = {"_key": str(doc_id).split("/", 1)[-1]}
+        if rev is not None:
+            selector["_rev"] = rev
+        query = (
+            "UPDATE @selector WITH @patch IN @@collection "
+            "OPTIONS {ignoreRevs: false, mergeObjects: @merge_objects, keepNull: @keep_null} "
+            "RETURN {_id: NEW._id, _key: NEW._key, _rev: NEW._rev, _old_rev: OLD._rev}"
+        )
+        bind_vars = {
+            "selector": selector,
+            "patch": update_data,
+            "@collection": collection_name or self.entities_collection_name,
+            "merge_objects": merge_objects,
+            "keep_null": keep_null,
+        }
+        async with self.pool.acquire() as conn:
+            try:
+                cursor = await conn.aql.execute(query, bind_vars=bind_vars)
+                results = [item async for item in cursor]
+            except AQLQueryExecuteError as e:
+                if e.error_code == ERROR_DOCUMENT_NOT_FOUND:
+                    return None
+                if e.error_code == ERROR_REVISION_CONFLICT:
+                    raise RevisionConflictError(f"Документ {doc_id} изменен другим запросом")
+                raise ValueError(f"Ошибка обновления документа: {e}")
+        return results[0] if results else None
+
+    async def update_many(self, updates: List[Dict[str, Any]], merge_objects: bool = True,
+                          keep_null: bool = True, chunk_size: int = 1000,
+                          collection_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Пакетное частичное обновление: один AQL-запрос на chunk_size документов.
+
+        :param updates: Список словарей с '_key', необязательным '_rev' (проверяется)
+                        и изменяемыми атрибутами.
+        :param merge_objects: См. update_document.
+        :param keep_null: См. update_document.
+        :param chunk_size: Количество документов в одном запросе.
+        :param collection_name: Коллекция; по умолчанию коллекция сущностей.
+        :return: Словарь с ключами 'updated' (количество) и 'failed' (ключи документов,
+                 которые не найдены или изменились с указанного _rev).
+        """
+        for update in updates:
+            if not update.get("_key"):
+                raise ValueError(f"Не указан _key: {update}")
+
+        # ignoreErrors: ошибка одного документа не прерывает пакет, он попадает в failed
+        query = (
+            "FOR u IN @updates "
+            "UPDATE u WITH UNSET(u, '_key', '_rev', '_id') IN @@collection "
+            "OPTIONS {ignoreRevs: false, ignoreErrors: true, mergeObjects: @merge_objects, keepNull: @keep_null} "
+            "RETURN NEW._key"
+        )
+        updated = 0
+        failed = []
+        async with self.pool.acquire() as conn:
+            for start in range(0, len(updates), chunk_size):
+                chunk = updates[start:start + chunk_size]
+                try:
+                    cursor = await conn.aql.execute(query, bind_vars={
+                        "updates": chunk,
+                        "@collection": collection_name or self.entities_collection_name,
+                        "merge_objects": merge_objects,
+                        "keep_null": keep_null,
+                    }, batch_size=chunk_size)
+                    done = {key async for key in cursor}
+                except AQLQueryExecuteError as e:
+                    raise ValueError(f"Ошибка пакетного обновления документов: {e}")
+                updated += len(done)
+                failed += [update["_key"] for update in chunk if update["_key"] not in done]
+        return {"updated": updated, "failed": failed}
 
     async def delete_document(self, doc_id):
         """Удаление документа по ID."""
-        conn = await self.pool.get_connection()
-        try:
+        async with self.pool.acquire() as conn:
             collection = conn.collection(self.entities_collection_name)
             return await collection.delete(doc_id)
-        finally:
-            await self.pool.release_connection(conn)
 
     async def create_graph(self, edge_collection_name):
         """Создание графовой и рёберной коллекций."""
-        conn = await self.pool.get_connection()
-        try:
+        async with self.pool.acquire() as conn:
             #if not await conn.has_collection(graph_name):
             #    await conn.create_collection(graph_name)
             if not await conn.has_collection(edge_collection_name):
                 await conn.create_collection(edge_collection_name, edge=True)
-        finally:
-            await self.pool.release_connection(conn)
 
     async def create_edge(self, from_doc_id, to_doc_id, edge_collection_name):
         """Создание связи (рёберного документа) между объектами."""
-        conn = await self.pool.get_connection()
-        try:
-            edge_collection = conn.collection(edge_collection_name)
-            edge = {"_from": from_doc_id, "_to": to_doc_id}
-            return await edge_collection.insert(edge)
-        except DocumentInsertError:
-            return None
-        finally:
-            await self.pool.release_connection(conn)
+        async with self.pool.acquire() as conn:
+            try:
+                edge_collection = conn.collection(edge_collection_name)
+                edge = {"_from": from_doc_id, "_to": to_doc_id}
+                result = await edge_collection.insert(edge)
+            except DocumentInsertError:
+                return None
+        if self.adjacency is not None and edge_collection_name == self.edges_name:
+            self.adjacency.apply_edge(result["_key"], result["_rev"], from_doc_id, to_doc_id)
+        return result
 
     async def insert_order_data(self, collection_name, data):
         """Вставка данных заказа в коллекцию."""
@@ -130,24 +396,125 @@ class ArangoModelEntity:
 
     async def get_edges(self, edge_collection_name):
         """Получение всех рёбер из рёберной коллекции."""
-        conn = await self.pool.get_connection()
-        try:
-            edge_collection = conn.collection(edge_collection_name)
-            cursor = await edge_collection.all()
-            return [edge async for edge in cursor]
-        finally:
-            await self.pool.release_connection(conn)
+        return [edge async for edge in self.iter_edges(edge_collection_name)]
             
-    async def get_multilevel_connections(self):
-        db = await client.db('your_database', username='root', password='')
+    async def traverse(self, start_vertex: str, min_depth: int = 1, max_depth: int = 1,
+                       direction: str = "outbound", vertex_filters: Optional[List[Dict[str, Any]]] = None,
+                       edge_filters: Optional[List[Dict[str, Any]]] = None,
+                       prune_filters: Optional[List[Dict[str, Any]]] = None,
+                       offset: int = 0, limit: Optional[int] = None,
+                       batch_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Обход графа по коллекции рёбер с потоковой выдачей результатов.
+
+        Обход выполняется в ширину с уникальностью вершин, поэтому каждая
+        вершина возвращается один раз, на минимальной глубине. Результаты
+        читаются потоковым курсором порциями по batch_size.
+
+        :param start_vertex: _id начальной вершины ("collection/key") или ключ в коллекции сущностей.
+        :param min_depth: Минимальная глубина.
+        :param max_depth: Максимальная глубина.
+        :param direction: "outbound", "inbound" или "any".
+        :param vertex_filters: Фильтры вершин (см. build_aql_conditions).
+        :param edge_filters: Фильтры последнего ребра пути.
+        :param prune_filters: Условия остановки: обход не продолжается дальше вершины,
+                              удовлетворяющей любому из них (сама вершина возвращается).
+        :param offset: Сколько результатов пропустить.
+        :param limit: Максимальное количество результатов (None — без ограничения).
+        :param batch_size: Размер порции курсора.
+        :return: Асинхронный генератор словарей с ключами 'vertex', 'edge' и 'depth'.
+        """
+        if direction not in TRAVERSAL_DIRECTIONS:
+            raise ValueError(f"Недопустимое направление обхода: {direction}")
+        if not 0 <= min_depth <= max_depth:
+            raise ValueError("Некорректный диапазон глубины обхода")
+
+        vertex_conditions, bind_vars = build_aql_conditions("v", vertex_filters, "v")
+        edge_conditions, edge_vars = build_aql_conditions("e", edge_filters, "e")
+        prune_conditions, prune_vars = build_aql_conditions("v", prune_filters, "p")
+        bind_vars.update(edge_vars)
+        bind_vars.update(prune_vars)
+        bind_vars.update({
+            "start": self._vertex_id(start_vertex),
+            "min_depth": min_depth,
+            "max_depth": max_depth,
+            "@edges": self.edges_name,
+        })
+
+        lines = [
+            f"FOR v, e, p IN @min_depth..@max_depth {TRAVERSAL_DIRECTIONS[direction]} @start @@edges",
+        ]
+        if prune_conditions:
+            lines.append(f"PRUNE {' OR '.join(prune_conditions)}")
+        lines.append('OPTIONS {order: "bfs", uniqueVertices: "global"}')
+        lines += [f"FILTER {condition}" for condition in vertex_conditions + edge_conditions]
+        if limit is not None or offset:
+            lines.append("LIMIT @offset, @limit")
+            bind_vars.update({"offset": offset, "limit": limit if limit is not None else 2 ** 31})
+        lines.append("RETURN {vertex: v, edge: e, depth: LENGTH(p.edges)}")
+
+        async for item in self._stream_query("\n".join(lines), bind_vars, batch_size, "Ошибка обхода графа"):
+            yield item
+
+    async def get_connections_page(self, start_vertex: str, page: int = 1, page_size: int = 50,
+                                   **options) -> Dict[str, Any]:
+        """
+        Страница результатов обхода графа.
+
+        :param start_vertex: Начальная вершина.
+        :param page: Номер страницы, начиная с 1.
+        :param page_size: Размер страницы.
+        :param options: Остальные параметры traverse (глубина, направление, фильтры).
+        :return: Словарь с ключами 'items', 'page' и 'has_next'.
+        """
+        page = max(page, 1)
+        items = [
+            item async for item in self.traverse(
+                start_vertex, offset=(page - 1) * page_size, limit=page_size + 1,
+                batch_size=page_size + 1, **options
+            )
+        ]
+        return {"items": items[:page_size], "page": page, "has_next": len(items) > page_size}
+
+    async def get_neighbors(self, vertex: str, max_depth: int = 1,
+                            direction: str = "outbound") -> List[Dict[str, Any]]:
+        """
+        Соседи вершины на расстоянии 1 или 2 по коллекции рёбер.
+
+        Отвечает из индекса смежности в памяти, если он загружен и свеж,
+        иначе — AQL-обходом. Первое обращение запускает фоновое обновление индекса.
 
-        query = """
-        FOR v, e, p IN 1..3 OUTBOUND 'users/startUser' friendships
-            RETURN { user: v, path: p }
+        :param vertex: _id или ключ вершины в коллекции сущностей.
+        :param max_depth: 1 или 2.
+        :param direction: "outbound", "inbound" или "any".
+        :return: Список словарей с ключами 'id' и 'depth'.
         """
+        if max_depth not in (1, 2):
+            raise ValueError("Поддерживается глубина 1 или 2")
+        if direction not in TRAVERSAL_DIRECTIONS:
+            raise ValueError(f"Недопустимое направление обхода: {direction}")
+        vertex_id = self._vertex_id(vertex)
+        if self.adjacency is not None:
+            self.adjacency.ensure_running()
+            if self.adjacency.is_warm:
+                return self.adjacency.lookup(vertex_id, max_depth, direction)
 
-        cursor = await db.aql.execute(query)
-        result = [doc async for doc in cursor]
+        # Id берется из ребра, а не из v: как и в индексе, учитываются рёбра к удаленным вершинам
+        if direction == "any":
+            end = "e._from == p.vertices[-2]._id ? e._to : e._from"
+        else:
+            end = "e._to" if direction == "outbound" else "e._from"
+        query = (
+            f"FOR v, e, p IN 1..@max_depth {TRAVERSAL_DIRECTIONS[direction]} @start @@edges "
+            'OPTIONS {order: "bfs", uniqueVertices: "global"} '
+            f"RETURN {{id: {end}, depth: LENGTH(p.edges)}}"
+        )
+        bind_vars = {"max_depth": max_depth, "start": vertex_id, "@edges": self.edges_name}
+        return [item async for item in self._stream_query(query, bind_vars, 1000, "Ошибка получения соседей")]
 
-        await client.close()
-        return result
\ No newline at end of file
+    async def get_multilevel_connections(self, start_vertex: str, max_depth: int = 3,
+                                         direction: str = "outbound") -> List[Dict[str, Any]]:
+        """Все связанные вершины до max_depth шагов от начальной."""
+        return [
+            item async for item in self.traverse(start_vertex, min_depth=1, max_depth=max_depth, direction=direction)
+        ]
@@ -0,0 +1,110 @@
+from typing import Dict, List, Optional, Tuple
+
+# Агрегатная функция -> допустимые типы колонок (None — любая колонка, включая count(*))
+AGGREGATE_FUNCTIONS = {
+    "count": None,
+    "sum": ("integer", "bigint", "smallint", "numeric", "real", "double precision"),
+    "avg": ("integer", "bigint", "smallint", "numeric", "real", "double precision"),
+    "min": ("integer", "bigint", "smallint", "numeric", "real", "double precision",
+            "timestamp without time zone", "timestamp with time zone", "date"),
+    "max": ("integer", "bigint", "smallint", "numeric", "real", "double precision",
+            "timestamp without time zone", "timestamp with time zone", "date"),
+}
+
+DATE_TRUNC_UNITS = ("hour", "day", "week", "month", "quarter", "year")
+
+TIMESTAMP_TYPES = ("timestamp without time zone", "timestamp with time zone", "date")
+
+
+def normalize_aggregation(columns: Dict[str, str], group_by: Optional[List[str]],
+                          bucket: Optional[Tuple[str, str]],
+                          metrics: Optional[List[Tuple[str, Optional[str]]]]):
+    """
+    Проверяет параметры агрегации по схеме таблицы.
+
+    :param columns: Словарь имя колонки -> тип данных.
+    :param group_by: Колонки группировки.
+    :param bucket: Пара (timestamp-колонка, единица date_trunc) или None.
+    :param metrics: Список пар (функция, колонка или None для count(*)).
+    :return: Кортеж (group_by, bucket, metrics) в нормализованном виде.
+    """
+    group_by = list(group_by or [])
+    metrics = list(metrics or [("count", None)])
+
+    for column in group_by:
+        if column not in columns:
+            raise ValueError(f"Колонка '{column}' не существует")
+
+    if bucket is not None:
+        column, unit = bucket
+        if column not in columns:
+            raise ValueError(f"Колонка '{column}' не существует")
+        if columns[column] not in TIMESTAMP_TYPES:
+            raise ValueError(f"Колонка '{column}' не является датой")
+        if unit not in DATE_TRUNC_UNITS:
+            raise ValueError(f"Недопустимая единица интервала: {unit}")
+
+    for func, column in metrics:
+        if func not in AGGREGATE_FUNCTIONS:
+            raise ValueError(f"Недопустимая агрегатная функция: {func}")
+        if column is None:
+            if func != "count":
+                raise ValueError(f"Функция {func} требует колонку")
+            continue
+        if column not in columns:
+            raise ValueError(f"Колонка '{column}' не существует")
+        allowed = AGGREGATE_FUNCTIONS[func]
+        if allowed is not None and columns[column] not in allowed:
+            raise ValueError(f"Функция {func} неприменима к колонке '{column}'")
+
+    return group_by, bucket, metrics
+
+
+def metric_alias(func: str, column: Optional[str]) -> str:
+    return func if column is None else f"{func}_{column}"
+
+
+def build_aggregate_query(table_name: str, group_by: List[str], bucket: Optional[Tuple[str, str]],
+                          metrics: List[Tuple[str, Optional[str]]], where: str = "") -> str:
+    """
+    Формирует SQL агрегации: GROUP BY по колонкам и интервалу date_trunc.
+
+    :return: Текст запроса с параметром :limit и параметрами фильтров.
+    """
+    keys = list(group_by)
+    if bucket is not None:
+        column, unit = bucket
+        keys.append(f"date_trunc('{unit}', {column}) AS bucket")
+
+    aggregates = [
+        f"{func}({'*' if column is None else column}) AS {metric_alias(func, column)}"
+        for func, column in metrics
+    ]
+    select_sql = ", ".join(keys + aggregates)
+    where_sql = f"WHERE {where}" if where else ""
+
+    group_sql = ""
+    if keys:
+        positions = ", ".join(str(i) for i in range(1, len(keys) + 1))
+        group_sql = f"GROUP BY {positions} ORDER BY {positions}"
+
+    return f"SELECT {select_sql} FROM {table_name} {where_sql} {group_sql} LIMIT :limit"
+
+
+def parse_metric_params(values: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """Разбирает параметры вида "функция" или "функция:колонка"."""
+    metrics = []
+    for value in values:
+        func, _, column = value.partition(":")
+        metrics.append((func, column or None))
+    return metrics
+
+
+def parse_bucket_param(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Разбирает параметр вида "колонка:единица"."""
+    if not value:
+        return None
+    column, _, unit = value.partition(":")
+    if not unit:
+        raise ValueError(f"Некорректный интервал: {value}")
+    return column, unit
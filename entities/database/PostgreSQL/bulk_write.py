@@ -0,0 +1,91 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Максимальное количество параметров в одном запросе asyncpg (протокол Postgres — 32767)
+MAX_QUERY_PARAMS = 32000
+
+
+def group_by_columns(rows: Sequence[Dict[str, Any]]) -> Dict[Tuple[str, ...], List[Dict[str, Any]]]:
+    """Группирует строки по набору колонок, сохраняя порядок строк внутри группы."""
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row.keys())), []).append(row)
+    return groups
+
+
+def chunks(rows: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def build_upsert(table_name: str, columns: Sequence[str], update_columns: Sequence[str],
+                 conflict_columns: Sequence[str], touch_column: Optional[str] = None) -> str:
+    """
+    Формирует INSERT ... ON CONFLICT DO UPDATE для одной строки (выполняется через executemany).
+
+    Строки, у которых значения не изменились, не обновляются — не создаются
+    лишние версии строк и не сдвигается touch_column.
+
+    :param table_name: Имя таблицы.
+    :param columns: Колонки вставки (включая conflict_columns и touch_column).
+    :param update_columns: Колонки, перезаписываемые при конфликте.
+    :param conflict_columns: Колонки уникального ограничения.
+    :param touch_column: Колонка времени изменения (например, updated_at) или None.
+    :return: Текст запроса.
+    """
+    columns_sql = ", ".join(columns)
+    values_sql = ", ".join(f":{column}" for column in columns)
+    conflict_sql = ", ".join(conflict_columns)
+    if not update_columns:
+        return (f"INSERT INTO {table_name} ({columns_sql}) VALUES ({values_sql}) "
+                f"ON CONFLICT ({conflict_sql}) DO NOTHING")
+
+    assignments = [f"{column} = EXCLUDED.{column}" for column in update_columns]
+    if touch_column:
+        assignments.append(f"{touch_column} = EXCLUDED.{touch_column}")
+    current = ", ".join(f"{table_name}.{column}" for column in update_columns)
+    incoming = ", ".join(f"EXCLUDED.{column}" for column in update_columns)
+    return (
+        f"INSERT INTO {table_name} ({columns_sql}) VALUES ({values_sql}) "
+        f"ON CONFLICT ({conflict_sql}) DO UPDATE SET {', '.join(assignments)} "
+        f"WHERE ROW({current}) IS DISTINCT FROM ROW({incoming})"
+    )
+
+
+def build_update_from_values(table_name: str, key_column: str, columns: Sequence[str],
+                             column_types: Dict[str, str], rows_count: int,
+                             touch_column: Optional[str] = None) -> str:
+    """
+    Формирует UPDATE ... FROM (VALUES ...) для пакета строк.
+
+    Значения приводятся к типам колонок явно: без этого Postgres выводит для
+    VALUES тип text. Параметры называются p{номер строки}_{номер колонки}.
+
+    :param table_name: Имя таблицы.
+    :param key_column: Колонка, по которой ищутся строки (обычно id).
+    :param columns: Обновляемые колонки (без key_column).
+    :param column_types: Словарь имя колонки -> тип данных.
+    :param rows_count: Количество строк в пакете.
+    :param touch_column: Колонка времени изменения или None.
+    :return: Текст запроса с параметром :touched_at, если задан touch_column.
+    """
+    value_columns = [key_column, *columns]
+    values_sql = ", ".join(
+        "(" + ", ".join(f"CAST(:p{i}_{j} AS {column_types[column]})" for j, column in enumerate(value_columns)) + ")"
+        for i in range(rows_count)
+    )
+    assignments = [f"{column} = v.{column}" for column in columns]
+    if touch_column:
+        assignments.append(f"{touch_column} = :touched_at")
+    current = ", ".join(f"t.{column}" for column in columns)
+    incoming = ", ".join(f"v.{column}" for column in columns)
+    return (
+        f"UPDATE {table_name} AS t SET {', '.join(assignments)} "
+        f"FROM (VALUES {values_sql}) AS v ({', '.join(value_columns)}) "
+        f"WHERE t.{key_column} = v.{key_column} AND ROW({current}) IS DISTINCT FROM ROW({incoming})"
+    )
+
+
+def update_params(rows: Sequence[Dict[str, Any]], key_column: str, columns: Sequence[str]) -> Dict[str, Any]:
+    """Разворачивает пакет строк в параметры build_update_from_values."""
+    value_columns = [key_column, *columns]
+    return {f"p{i}_{j}": row[column] for i, row in enumerate(rows) for j, column in enumerate(value_columns)}
@@ -0,0 +1,143 @@
+import logging
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class StatementStats:
+    __slots__ = ("count", "total_time", "max_time", "rows")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+
+    def add(self, elapsed: float, rows: int):
+        self.count += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.rows += rows
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_time * 1000, 3),
+            "max_ms": round(self.max_time * 1000, 3),
+            "rows": self.rows,
+        }
+
+
+class RequestStats(StatementStats):
+    __slots__ = ("pool_wait", "shapes")
+
+    def __init__(self):
+        super().__init__()
+        self.pool_wait = 0.0
+        self.shapes: Counter = Counter()
+
+    def as_dict(self) -> Dict[str, Any]:
+        summary = super().as_dict()
+        summary["pool_wait_ms"] = round(self.pool_wait * 1000, 3)
+        return summary
+
+
+# Статистика текущего запроса (None вне track_request)
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("sql_request_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """Нормализует текст запроса: параметры уже вынесены, остаётся схлопнуть пробелы."""
+    return " ".join(statement.split())
+
+
+class SQLInstrumentation:
+    def __init__(self, slow_query_threshold: Optional[float] = 0.5, max_shapes: int = 1000):
+        """
+        Сбор статистики SQL по событиям движка.
+
+        Считает количество запросов, суммарное и максимальное время, строки и
+        ожидание пула — по каждой форме запроса и по каждому HTTP-запросу.
+
+        :param slow_query_threshold: Порог медленного запроса в секундах (None — не логировать).
+        :param max_shapes: Сколько форм запросов хранить (вытесняются самые давние).
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.max_shapes = max_shapes
+        self._shapes: "OrderedDict[str, StatementStats]" = OrderedDict()
+
+    def attach(self, engine: AsyncEngine):
+        """Подписывается на события выполнения запросов движка."""
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["sql_query_start"].pop()
+        # Для SELECT rowcount у asyncpg равен -1, число строк берётся из буфера курсора
+        rowcount = getattr(cursor, "rowcount", -1)
+        rows = rowcount if rowcount and rowcount > 0 else len(getattr(cursor, "_rows", None) or ())
+        shape = statement_shape(statement)
+
+        stats = self._shapes.get(shape)
+        if stats is None:
+            stats = self._shapes[shape] = StatementStats()
+            if len(self._shapes) > self.max_shapes:
+                self._shapes.popitem(last=False)
+        else:
+            self._shapes.move_to_end(shape)
+        stats.add(elapsed, rows)
+
+        current = request_stats.get()
+        if current is not None:
+            current.add(elapsed, rows)
+            current.shapes[shape] += 1
+
+        if self.slow_query_threshold is not None and elapsed >= self.slow_query_threshold:
+            logger.warning(f"Медленный запрос ({elapsed * 1000:.1f} мс, строк: {rows}): {shape}")
+
+    def _handle_error(self, exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("sql_query_start"):
+            conn.info["sql_query_start"].pop()
+
+    @staticmethod
+    def record_pool_wait(seconds: float):
+        """Добавляет время ожидания соединения из пула к текущему запросу."""
+        current = request_stats.get()
+        if current is not None:
+            current.pool_wait += seconds
+
+    @contextmanager
+    def track_request(self):
+        """Собирает статистику SQL внутри блока (одного HTTP-запроса)."""
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            request_stats.reset(token)
+
+    def snapshot(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Возвращает статистику по формам запросов, самые затратные первыми.
+
+        :param limit: Максимальное количество форм.
+        :return: Список словарей с ключами 'statement', 'count', 'total_ms', 'max_ms', 'rows'.
+        """
+        items = sorted(self._shapes.items(), key=lambda item: item[1].total_time, reverse=True)
+        return [{"statement": shape, **stats.as_dict()} for shape, stats in items[:limit]]
+
+    def reset(self):
+        """Сбрасывает накопленную статистику по формам запросов."""
+        self._shapes.clear()
@@ -0,0 +1,134 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Допустимые порядки сортировки для keyset-пагинации: имя -> колонки ключа.
+# Колонки ключа должны быть NOT NULL: строки с NULL не проходят сравнение кортежей
+KEYSET_ORDERINGS = {
+    "id": ("id",),
+    "created_at": ("created_at", "id"),
+}
+
+DIRECTION_NEXT = "next"
+DIRECTION_PREV = "prev"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(order_by: str, key: Tuple[Any, ...], direction: str) -> str:
+    """
+    Кодирует позицию в таблице в непрозрачный курсор.
+
+    :param order_by: Имя порядка сортировки из KEYSET_ORDERINGS.
+    :param key: Значения колонок ключа у граничной строки.
+    :param direction: Направление перехода ("next" или "prev").
+    :return: Строка курсора, безопасная для передачи в URL.
+    """
+    payload = {"o": order_by, "k": [_encode_value(v) for v in key], "d": direction}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Декодирует курсор, полученный от encode_cursor.
+
+    :param cursor: Строка курсора.
+    :return: Словарь с ключами 'order_by', 'key' и 'direction'.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        order_by = payload["o"]
+        direction = payload["d"]
+        key = tuple(_decode_value(v) for v in payload["k"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Некорректный курсор")
+
+    if order_by not in KEYSET_ORDERINGS or direction not in (DIRECTION_NEXT, DIRECTION_PREV):
+        raise ValueError("Некорректный курсор")
+    if len(key) != len(KEYSET_ORDERINGS[order_by]):
+        raise ValueError("Некорректный курсор")
+
+    return {"order_by": order_by, "key": key, "direction": direction}
+
+
+def build_keyset_query(table_name: str, order_by: str, direction: Optional[str], where: str = "") -> str:
+    """
+    Формирует SQL для выборки страницы по ключу без OFFSET.
+
+    Ключ сравнивается как кортеж (row comparison), поэтому Postgres использует
+    индекс по колонкам ключа и стоимость любой страницы одинакова.
+
+    :param table_name: Имя таблицы.
+    :param order_by: Имя порядка сортировки из KEYSET_ORDERINGS.
+    :param direction: Направление относительно курсора или None для первой страницы.
+    :param where: Дополнительное условие фильтрации (без WHERE).
+    :return: Текст запроса с параметрами :k0..:kN и :limit.
+    """
+    key_columns = KEYSET_ORDERINGS[order_by]
+    columns_sql = ", ".join(key_columns)
+    params_sql = ", ".join(f":k{i}" for i in range(len(key_columns)))
+
+    conditions = [f"({where})"] if where else []
+    if direction == DIRECTION_NEXT:
+        conditions.append(f"({columns_sql}) > ({params_sql})")
+    elif direction == DIRECTION_PREV:
+        conditions.append(f"({columns_sql}) < ({params_sql})")
+    if direction is not None and len(key_columns) > 1:
+        # Сравнение кортежей не участвует в отсечении секций, поэтому первая
+        # колонка ключа дублируется простым условием
+        conditions.append(f"{key_columns[0]} {'>=' if direction == DIRECTION_NEXT else '<='} :k0")
+    where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    sort = "DESC" if direction == DIRECTION_PREV else "ASC"
+    order_sql = ", ".join(f"{column} {sort}" for column in key_columns)
+    return f"SELECT * FROM {table_name} {where_sql} ORDER BY {order_sql} LIMIT :limit"
+
+
+def row_key(row: Dict[str, Any], order_by: str) -> Tuple[Any, ...]:
+    """Возвращает значения колонок ключа для строки."""
+    return tuple(row[column] for column in KEYSET_ORDERINGS[order_by])
+
+
+def build_page(rows: List[Dict[str, Any]], limit: int, order_by: str,
+               direction: Optional[str]) -> Dict[str, Any]:
+    """
+    Собирает страницу из строк, выбранных с LIMIT limit + 1.
+
+    :param rows: Строки в порядке выборки (для "prev" — в обратном).
+    :param limit: Размер страницы.
+    :param order_by: Имя порядка сортировки.
+    :param direction: Направление, с которым выполнялся запрос.
+    :return: Словарь с ключами 'rows', 'next_cursor' и 'prev_cursor'.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == DIRECTION_PREV:
+        rows.reverse()
+
+    if direction == DIRECTION_PREV:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, direction == DIRECTION_NEXT
+
+    next_cursor = None
+    prev_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor(order_by, row_key(rows[-1], order_by), DIRECTION_NEXT)
+    if rows and has_prev:
+        prev_cursor = encode_cursor(order_by, row_key(rows[0], order_by), DIRECTION_PREV)
+
+    return {"rows": rows, "next_cursor": next_cursor, "prev_cursor": prev_cursor}
@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+# Колонка, по которой секционируются таблицы сущностей
+PARTITION_KEY = "created_at"
+# Суффикс имени месячной секции: app_entity_5_p202401
+PARTITION_SUFFIX_PATTERN = "_p([0-9]{6})$"
+
+
+def month_start(value: datetime) -> datetime:
+    """Возвращает начало месяца для момента времени."""
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    """Сдвигает начало месяца на count месяцев."""
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def months_range(start: datetime, end: datetime) -> List[datetime]:
+    """
+    Возвращает начала месяцев от месяца start до месяца end включительно.
+
+    :param start: Нижняя граница.
+    :param end: Верхняя граница.
+    :return: Список начал месяцев.
+    """
+    months = []
+    month, last = month_start(start), month_start(end)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partition_name(table_name: str, month: datetime) -> str:
+    return f"{table_name}_p{month:%Y%m}"
+
+
+def parse_partition_month(suffix: Optional[str]) -> Optional[datetime]:
+    """Разбирает суффикс YYYYMM имени секции."""
+    if not suffix:
+        return None
+    return datetime(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def build_partition_ddl(table_name: str, month: datetime) -> str:
+    """Формирует CREATE TABLE для месячной секции (идемпотентно)."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table_name, month)} PARTITION OF {table_name} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    )
+
+
+def timestamps_range(rows: Iterable[dict]) -> Tuple[datetime, datetime]:
+    """
+    Возвращает минимальное и максимальное значение ключа секционирования в строках.
+
+    Строки без значения попадают в текущий месяц (значение по умолчанию now()).
+    """
+    values = [row.get(PARTITION_KEY) for row in rows]
+    values = [value.replace(tzinfo=None) if isinstance(value, datetime) else datetime.now()
+              for value in values] or [datetime.now()]
+    return min(values), max(values)
@@ -0,0 +1,141 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Операторы фильтра -> шаблон SQL-условия
+FILTER_OPERATORS = {
+    "eq": "{column} = {param}",
+    "ne": "{column} <> {param}",
+    "lt": "{column} < {param}",
+    "lte": "{column} <= {param}",
+    "gt": "{column} > {param}",
+    "gte": "{column} >= {param}",
+    "contains": "{column} @> CAST({param} AS JSONB)",
+}
+
+# Операторы, применимые только к JSONB-колонкам
+JSONB_OPERATORS = {"contains"}
+
+SORT_DIRECTIONS = {"asc": "ASC", "desc": "DESC"}
+
+
+def coerce_value(value: Any, data_type: str) -> Any:
+    """
+    Приводит значение из запроса или JSON к типу колонки.
+
+    :param value: Значение (строка из запроса или значение JSON).
+    :param data_type: Тип колонки из information_schema.
+    :return: Значение, которое asyncpg примет для колонки этого типа.
+    """
+    if value is None:
+        return None
+    if data_type in ("jsonb", "json"):
+        return value if isinstance(value, str) else json.dumps(value)
+    if not isinstance(value, str):
+        return value
+    if data_type in ("integer", "bigint", "smallint"):
+        return int(value)
+    if data_type.startswith("timestamp") or data_type == "date":
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _coerce(value: Any, data_type: str, op: str) -> Any:
+    """Приводит значение фильтра к типу колонки."""
+    if op == "contains":
+        if isinstance(value, str):
+            json.loads(value)
+            return value
+        return json.dumps(value)
+    return coerce_value(value, data_type)
+
+
+def normalize_filters(filters: Optional[List[Dict[str, Any]]],
+                      columns: Dict[str, str]) -> List[Tuple[str, str, Any]]:
+    """
+    Проверяет фильтры по схеме таблицы и приводит значения к типам колонок.
+
+    :param filters: Список словарей с ключами 'column', 'op' и 'value'.
+    :param columns: Словарь имя колонки -> тип данных.
+    :return: Отсортированный список (колонка, оператор, значение).
+    """
+    normalized = []
+    for item in filters or []:
+        column, op, value = item.get("column"), item.get("op", "eq"), item.get("value")
+        if column not in columns:
+            raise ValueError(f"Колонка '{column}' не существует")
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Недопустимый оператор фильтра: {op}")
+        if op in JSONB_OPERATORS and columns[column] != "jsonb":
+            raise ValueError(f"Оператор {op} применим только к JSONB-колонкам")
+        try:
+            normalized.append((column, op, _coerce(value, columns[column], op)))
+        except (TypeError, ValueError):
+            raise ValueError(f"Некорректное значение фильтра для колонки '{column}'")
+    return sorted(normalized, key=lambda item: (item[0], item[1]))
+
+
+def normalize_sort(sort: Optional[List[Tuple[str, str]]], columns: Dict[str, str]) -> List[Tuple[str, str]]:
+    """
+    Проверяет сортировку по схеме таблицы.
+
+    :param sort: Список пар (колонка, "asc" | "desc").
+    :param columns: Словарь имя колонки -> тип данных.
+    :return: Список пар (колонка, направление).
+    """
+    normalized = []
+    for column, direction in sort or []:
+        if column not in columns:
+            raise ValueError(f"Колонка '{column}' не существует")
+        if direction not in SORT_DIRECTIONS:
+            raise ValueError(f"Недопустимое направление сортировки: {direction}")
+        normalized.append((column, direction))
+    return normalized
+
+
+def build_where(filters: List[Tuple[str, str, Any]], param_prefix: str = "f") -> Tuple[str, Dict[str, Any]]:
+    """
+    Формирует условие WHERE из нормализованных фильтров.
+
+    :param filters: Результат normalize_filters.
+    :param param_prefix: Префикс имен параметров.
+    :return: Пара (текст условия без WHERE или пустая строка, параметры).
+    """
+    clauses = []
+    params = {}
+    for i, (column, op, value) in enumerate(filters):
+        param = f"{param_prefix}{i}"
+        clauses.append(FILTER_OPERATORS[op].format(column=column, param=f":{param}"))
+        params[param] = value
+    return " AND ".join(clauses), params
+
+
+def filters_shape(filters: List[Tuple[str, str, Any]]) -> Tuple[str, ...]:
+    """Форма фильтров без значений — для ключа кэша выражений."""
+    return tuple(f"{column}:{op}" for column, op, _ in filters)
+
+
+def parse_filter_params(values: List[str]) -> List[Dict[str, Any]]:
+    """
+    Разбирает параметры запроса вида "колонка:оператор:значение".
+
+    :param values: Значения параметра filter.
+    :return: Список словарей для normalize_filters.
+    """
+    filters = []
+    for raw in values:
+        parts = raw.split(":", 2)
+        if len(parts) != 3:
+            raise ValueError(f"Некорректный фильтр: {raw}")
+        filters.append({"column": parts[0], "op": parts[1], "value": parts[2]})
+    return filters
+
+
+def parse_sort_params(values: List[str]) -> List[Tuple[str, str]]:
+    """
+    Разбирает параметры сортировки вида "колонка" или "-колонка".
+
+    :param values: Значения параметра sort.
+    :return: Список пар (колонка, направление).
+    """
+    return [(value[1:], "desc") if value.startswith("-") else (value, "asc") for value in values if value]
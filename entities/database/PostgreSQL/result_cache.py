@@ -0,0 +1,63 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TableVersions:
+    def __init__(self):
+        """
+        Счетчики версий таблиц в пределах процесса.
+
+        Версия увеличивается после каждой записи в таблицу, поэтому ключи кэша,
+        содержащие версию, перестают совпадать сразу после записи.
+        """
+        self._versions: Dict[str, int] = {}
+
+    def get(self, table_name: str) -> int:
+        return self._versions.get(table_name, 0)
+
+    def bump(self, table_name: str) -> int:
+        version = self._versions.get(table_name, 0) + 1
+        self._versions[table_name] = version
+        return version
+
+
+class ResultCache:
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = 30.0):
+        """
+        LRU-кэш результатов запросов с ограничением времени жизни.
+
+        Ключ должен включать версию таблицы из TableVersions. TTL ограничивает
+        устаревание из-за записей, сделанных другими процессами.
+
+        :param max_size: Максимальное количество результатов в кэше.
+        :param ttl: Время жизни результата в секундах (None — без ограничения).
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._items.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+        stored_at, value = item
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._items[key]
+            return default
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._items[key] = (time.monotonic(), value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
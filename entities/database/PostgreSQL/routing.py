@@ -0,0 +1,69 @@
+import itertools
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+
+class RoutingState:
+    def __init__(self, last_write: Optional[float] = None):
+        """
+        Время последней записи клиента (time.time()) для read-your-writes.
+
+        Хранится у клиента между запросами (подписанная cookie), поэтому
+        следующий запрос видит свою запись в любом процессе и воркере.
+
+        :param last_write: Время последней записи, пришедшее с запросом.
+        """
+        self.last_write = last_write
+        self.changed = False
+
+
+# Состояние клиента текущего запроса (None — чтения вне запроса, например в командах)
+routing_state: ContextVar[Optional[RoutingState]] = ContextVar("pg_routing_state", default=None)
+
+
+class ReplicaRouter:
+    def __init__(self, primary: async_sessionmaker, replicas: List[async_sessionmaker],
+                 read_your_writes_window: float = 5.0):
+        """
+        Выбор сессии для чтения: реплики по кругу, основной сервер после записи.
+
+        После записи все чтения того же клиента в течение
+        read_your_writes_window секунд идут на основной сервер, чтобы клиент
+        видел свои изменения несмотря на отставание реплик.
+
+        :param primary: Фабрика сессий основного сервера.
+        :param replicas: Фабрики сессий реплик.
+        :param read_your_writes_window: Окно read-your-writes в секундах.
+        """
+        self.primary = primary
+        self.replicas = replicas
+        self.read_your_writes_window = read_your_writes_window
+        self._replica_cycle = itertools.cycle(replicas) if replicas else None
+
+    def mark_write(self):
+        """Отмечает запись для клиента текущего запроса."""
+        state = routing_state.get()
+        if self._replica_cycle is None or state is None:
+            return
+        state.last_write = time.time()
+        state.changed = True
+
+    def reads_from_replica(self) -> bool:
+        """Пойдет ли очередное чтение текущего клиента на реплику (и может ли отставать)."""
+        return self._replica_cycle is not None and not self.recently_wrote()
+
+    def recently_wrote(self) -> bool:
+        """Открыто ли окно read-your-writes для клиента текущего запроса."""
+        state = routing_state.get()
+        if state is None or state.last_write is None:
+            return False
+        return time.time() - state.last_write < self.read_your_writes_window
+
+    def read_session_factory(self) -> async_sessionmaker:
+        """Возвращает фабрику сессий для очередного чтения."""
+        if not self.reads_from_replica():
+            return self.primary
+        return next(self._replica_cycle)
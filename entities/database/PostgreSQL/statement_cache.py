@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+
+class StatementCache:
+    def __init__(self, max_size: int = 1000):
+        """
+        LRU-кэш готовых SQL-выражений для динамических таблиц.
+
+        Ключ — (таблица, операция, набор колонок). Одинаковый текст запроса
+        для одинаковой формы позволяет SQLAlchemy брать скомпилированное
+        выражение из своего кэша, а asyncpg — переиспользовать prepared statement.
+
+        :param max_size: Максимальное количество выражений в кэше.
+        """
+        self.max_size = max_size
+        self._statements: "OrderedDict[Tuple[str, str, Tuple[str, ...]], TextClause]" = OrderedDict()
+
+    def get(self, table_name: str, operation: str, columns: Iterable[str],
+            build: Callable[[Tuple[str, ...]], str]) -> TextClause:
+        """
+        Возвращает выражение из кэша или строит его.
+
+        :param table_name: Имя таблицы.
+        :param operation: Имя операции ("insert", "update", "select" и т. п.).
+        :param columns: Колонки, от которых зависит текст запроса.
+        :param build: Функция, строящая текст запроса по отсортированным колонкам.
+        :return: Объект text().
+        """
+        columns = tuple(sorted(columns))
+        key = (table_name, operation, columns)
+        statement = self._statements.get(key)
+        if statement is not None:
+            self._statements.move_to_end(key)
+            return statement
+
+        statement = text(build(columns))
+        self._statements[key] = statement
+        if len(self._statements) > self.max_size:
+            self._statements.popitem(last=False)
+        return statement
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """Удаляет выражения одной таблицы или все."""
+        if table_name is None:
+            self._statements.clear()
+            return
+        for key in [key for key in self._statements if key[0] == table_name]:
+            del self._statements[key]
+
+    def __len__(self):
+        return len(self._statements)
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from .statement_cache import StatementCache
+
+logger = logging.getLogger(__name__)
+
+
+class BatchInsertWriter:
+    def __init__(self, session_factory: async_sessionmaker, table_name: str,
+                 max_rows: int = 100, max_delay: float = 0.005,
+                 statement_cache: Optional[StatementCache] = None):
+        """
+        Буфер вставок для одной таблицы.
+
+        Собирает конкурентные вставки в течение max_delay секунд или пока не
+        наберётся max_rows строк и записывает их одной транзакцией через
+        executemany. Каждый вызывающий получает свой результат: если пакет
+        целиком не прошёл, строки повторяются по одной под SAVEPOINT в той же
+        транзакции, и ошибка возвращается только виновным строкам.
+
+        :param session_factory: Фабрика асинхронных сессий.
+        :param table_name: Имя таблицы.
+        :param max_rows: Максимальный размер пакета.
+        :param max_delay: Максимальное ожидание пакета в секундах.
+        :param statement_cache: Кэш SQL-выражений; если не передан, создаётся свой.
+        """
+        self.session_factory = session_factory
+        self.table_name = table_name
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.statement_cache = statement_cache or StatementCache()
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes = set()
+
+    async def insert(self, data: Dict[str, Any]):
+        """
+        Ставит строку в очередь и ждёт записи её пакета.
+
+        :param data: Словарь с данными для вставки.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((data, future))
+        if len(self._pending) >= self.max_rows:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush_now)
+        await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    def _insert_query(self, columns: Tuple[str, ...]):
+        return self.statement_cache.get(self.table_name, "insert", columns, self._build_insert)
+
+    def _build_insert(self, columns: Tuple[str, ...]) -> str:
+        columns_str = ', '.join(f'"{col}"' for col in columns)
+        placeholders = ', '.join(f':{col}' for col in columns)
+        return f"INSERT INTO \"{self.table_name}\" ({columns_str}) VALUES ({placeholders})"
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for data, _ in batch:
+            groups.setdefault(tuple(sorted(data.keys())), []).append(data)
+
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    for columns, rows in groups.items():
+                        await session.execute(self._insert_query(columns), rows)
+        except SQLAlchemyError as e:
+            logger.warning(f"Пакетная вставка в {self.table_name} не удалась, повтор по строкам: {str(e)}")
+            await self._flush_rows(batch)
+        except Exception as e:
+            self._resolve(batch, e)
+        else:
+            self._resolve(batch, None)
+
+    async def _flush_rows(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        errors: List[Optional[Exception]] = []
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    for data, _ in batch:
+                        try:
+                            async with session.begin_nested():
+                                await session.execute(self._insert_query(tuple(data.keys())), data)
+                            errors.append(None)
+                        except SQLAlchemyError as e:
+                            errors.append(ValueError(f"Ошибка вставки данных: {str(e)}"))
+        except Exception as e:
+            self._resolve(batch, e)
+            return
+
+        for (_, future), error in zip(batch, errors):
+            self._resolve([(None, future)], error)
+
+    @staticmethod
+    def _resolve(batch, error: Optional[Exception]):
+        if isinstance(error, SQLAlchemyError):
+            error = ValueError(f"Ошибка вставки данных: {str(error)}")
+        for _, future in batch:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    async def close(self):
+        """Записывает накопленные строки и дожидается текущих пакетов."""
+        self._flush_now()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .ArangoDB.database_arango import ArangoModelEntity
+from .PostgreSQL.database_postgreSQL import PostgreModelEntity, SEARCH_VECTOR_COLUMN
+
+logger = logging.getLogger(__name__)
+
+# Очередь изменений: пишется триггерами в той же транзакции, что и данные
+OUTBOX_TABLE = "entity_sync_outbox"
+CAPTURE_FUNCTION = "entity_sync_capture"
+
+
+def vertex_key(table_name: str, record_id: int) -> str:
+    """Ключ вершины в ArangoDB для строки таблицы сущности."""
+    return f"{table_name}_{record_id}"
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def row_to_vertex(table_name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Преобразует строку таблицы сущности в документ вершины."""
+    vertex = {column: _json_value(value) for column, value in row.items() if column != SEARCH_VECTOR_COLUMN}
+    vertex.update({
+        "_key": vertex_key(table_name, row["id"]),
+        "entity_table": table_name,
+        "record_id": row["id"],
+    })
+    return vertex
+
+
+class GraphSync:
+    def __init__(self, pg: PostgreModelEntity, arango: ArangoModelEntity,
+                 batch_size: int = 500, poll_interval: float = 1.0, max_backoff: float = 30.0):
+        """
+        Репликация строк таблиц сущностей Postgres в вершины ArangoDB.
+
+        Вставки и обновления попадают в таблицу-очередь entity_sync_outbox
+        statement-триггерами (один INSERT на оператор записи, без обращений
+        к ArangoDB в пути записи). Обработчик забирает пакет очереди через
+        FOR UPDATE SKIP LOCKED, читает актуальные строки, делает upsert вершин
+        и удаляет из очереди той же транзакцией только записанные изменения.
+        Позиция репликации хранится в самой очереди: при сбое ArangoDB
+        транзакция откатывается, а изменения с ошибками остаются в очереди и
+        обрабатываются повторно (доставка не меньше одного раза, upsert
+        идемпотентен). Очередь отвязывает запись от скорости ArangoDB:
+        обработчик берет следующий пакет только после записи предыдущего.
+
+        :param pg: Подключение к Postgres.
+        :param arango: Модель ArangoDB.
+        :param batch_size: Размер пакета очереди.
+        :param poll_interval: Пауза между опросами пустой очереди в секундах.
+        :param max_backoff: Максимальная пауза между повторами после ошибки.
+        """
+        self.pg = pg
+        self.arango = arango
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+
+    async def install(self):
+        """Создает таблицу-очередь и функцию триггера (идемпотентно)."""
+        async with self.pg.engine.begin() as conn:
+            await conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {OUTBOX_TABLE} (
+                    id BIGSERIAL PRIMARY KEY,
+                    table_name TEXT NOT NULL,
+                    record_id INTEGER NOT NULL
+                )
+            """))
+            await conn.execute(text(f"""
+                CREATE OR REPLACE FUNCTION {CAPTURE_FUNCTION}() RETURNS trigger LANGUAGE plpgsql AS $$
+                BEGIN
+                    INSERT INTO {OUTBOX_TABLE} (table_name, record_id) SELECT TG_TABLE_NAME, id FROM changed_rows;
+                    RETURN NULL;
+                END
+                $$
+            """))
+
+    async def enable_table(self, table_name: str):
+        """
+        Включает захват изменений для таблицы и ставит в очередь её текущие строки.
+
+        CREATE TRIGGER блокирует запись в таблицу до конца транзакции, поэтому
+        между начальной выгрузкой и работой триггеров изменения не теряются.
+        """
+        async with self.pg.engine.begin() as conn:
+            # Таблицы переходов допускают только одно событие на триггер
+            for event in ("INSERT", "UPDATE"):
+                await conn.execute(text(
+                    f"CREATE TRIGGER {table_name}_sync_{event.lower()} AFTER {event} ON {table_name} "
+                    f"REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT "
+                    f"EXECUTE FUNCTION {CAPTURE_FUNCTION}()"
+                ))
+            await conn.execute(text(
+                f"INSERT INTO {OUTBOX_TABLE} (table_name, record_id) SELECT :table_name, id FROM {table_name}"
+            ), {"table_name": table_name})
+
+    async def enable_all(self) -> List[str]:
+        """
+        Включает захват изменений для таблиц сущностей, у которых его ещё нет.
+
+        :return: Список таблиц, для которых захват включен сейчас.
+        """
+        async with self.pg.get_session() as session:
+            result = await session.execute(text("""
+                SELECT c.relname
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+                  AND c.relname ~ '^app_entity_[0-9]+$'
+                  AND NOT EXISTS (
+                      SELECT 1 FROM pg_trigger t
+                      WHERE t.tgrelid = c.oid AND t.tgname = c.relname || '_sync_insert'
+                  )
+            """))
+            table_names = [row[0] for row in result.fetchall()]
+
+        for table_name in table_names:
+            await self.enable_table(table_name)
+        return table_names
+
+    async def _load_rows(self, conn, changes: List[Tuple[str, int]]) -> Dict[str, List[Dict[str, Any]]]:
+        ids_by_table: Dict[str, set] = {}
+        for table_name, record_id in changes:
+            ids_by_table.setdefault(table_name, set()).add(record_id)
+
+        rows = {}
+        for table_name, ids in ids_by_table.items():
+            # Читается текущее состояние: несколько изменений строки дают один upsert
+            result = await conn.execute(
+                text(f"SELECT * FROM {table_name} WHERE id = ANY(:ids)"), {"ids": sorted(ids)}
+            )
+            rows[table_name] = [dict(row._mapping) for row in result.fetchall()]
+        return rows
+
+    async def sync_once(self) -> int:
+        """
+        Обрабатывает один пакет очереди.
+
+        Из очереди удаляются только записи, вершины которых записаны в ArangoDB;
+        записи с ошибками остаются и обрабатываются повторно.
+
+        :return: Количество удаленных из очереди записей.
+        :raises RuntimeError: Если часть вершин не записана (после удаления остальных).
+        """
+        async with self.pg.engine.begin() as conn:
+            result = await conn.execute(text(f"""
+                SELECT id, table_name, record_id FROM {OUTBOX_TABLE}
+                ORDER BY id LIMIT :limit FOR UPDATE SKIP LOCKED
+            """), {"limit": self.batch_size})
+            entries = result.fetchall()
+            if not entries:
+                return 0
+
+            rows = await self._load_rows(conn, [(entry[1], entry[2]) for entry in entries])
+            vertices = [row_to_vertex(table_name, row) for table_name, items in rows.items() for row in items]
+            failed = set()
+            if vertices:
+                # Ошибка всего запроса прерывает транзакцию — пакет останется в очереди
+                outcome = await self.arango.insert_many(vertices, overwrite_mode="replace", chunk_size=self.batch_size)
+                for error in outcome["errors"]:
+                    vertex = vertices[error["index"]]
+                    failed.add((vertex["entity_table"], vertex["record_id"]))
+                    logger.warning(f"Вершина {vertex['_key']} не записана в ArangoDB: {error['error']}")
+
+            done = [entry[0] for entry in entries if (entry[1], entry[2]) not in failed]
+            if done:
+                await conn.execute(text(f"DELETE FROM {OUTBOX_TABLE} WHERE id = ANY(:ids)"), {"ids": done})
+
+        if failed:
+            # run() повторит оставшиеся записи с растущей паузой
+            raise RuntimeError(f"Не записано в ArangoDB вершин: {len(failed)}")
+        return len(done)
+
+    async def run(self, stop: Optional[asyncio.Event] = None, tables_check_interval: float = 60.0):
+        """
+        Обрабатывает очередь до установки stop.
+
+        Полные пакеты обрабатываются без пауз, пустая очередь опрашивается раз
+        в poll_interval секунд; после ошибок паузы растут до max_backoff.
+        Новые таблицы сущностей подключаются раз в tables_check_interval секунд.
+        Обработчик должен быть один: при нескольких порядок upsert одной строки не гарантирован.
+        """
+        stop = stop or asyncio.Event()
+        await self.install()
+        backoff = self.poll_interval
+        next_tables_check = 0.0
+        loop = asyncio.get_running_loop()
+
+        while not stop.is_set():
+            try:
+                if loop.time() >= next_tables_check:
+                    enabled = await self.enable_all()
+                    if enabled:
+                        logger.info(f"Захват изменений включен для таблиц: {', '.join(enabled)}")
+                    next_tables_check = loop.time() + tables_check_interval
+
+                processed = await self.sync_once()
+                backoff = self.poll_interval
+                if processed >= self.batch_size:
+                    continue
+                delay = self.poll_interval
+            except Exception as e:
+                logger.error(f"Ошибка репликации в ArangoDB: {str(e)}")
+                delay = backoff
+                backoff = min(backoff * 2, self.max_backoff)
+
+            try:
+                await asyncio.wait_for(stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+# Формат выгрузки -> (content type, расширение файла)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson; charset=utf-8", "ndjson"),
+}
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+async def encode_csv(columns: List[str], chunks: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Кодирует порции строк в CSV, начиная с заголовка.
+
+    :param columns: Имена колонок в порядке вывода.
+    :param chunks: Асинхронный генератор порций строк.
+    :return: Асинхронный генератор байтов, одна порция строк на элемент.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+
+    async for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow([_csv_value(row.get(column)) for column in columns])
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(columns: List[str], chunks: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Кодирует порции строк в NDJSON (один JSON-объект на строку).
+
+    :param columns: Имена колонок в порядке вывода.
+    :param chunks: Асинхронный генератор порций строк.
+    :return: Асинхронный генератор байтов, одна порция строк на элемент.
+    """
+    async for rows in chunks:
+        lines = [
+            json.dumps({column: row.get(column) for column in columns}, ensure_ascii=False, default=_json_default)
+            for row in rows
+        ]
+        yield ("\n".join(lines) + "\n").encode() if lines else b""
+
+
+ENCODERS = {
+    "csv": encode_csv,
+    "ndjson": encode_ndjson,
+}
@@ -17,5 +17,10 @@ class CreateEntityForm(forms.Form):
         required=False,
         widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Введите число'})
     )
+    partitioned = forms.BooleanField(
+        label="Секционировать по месяцам (для больших сущностей)",
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
     
     
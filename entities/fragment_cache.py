@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .database.PostgreSQL.result_cache import ResultCache, TableVersions
+from .database.PostgreSQL.routing import ReplicaRouter
+
+logger = logging.getLogger(__name__)
+
+
+class DjangoCacheFragmentBackend:
+    def __init__(self, alias: str = "default", timeout: Optional[float] = 300.0):
+        """
+        Общий для процессов кэш фрагментов поверх кэша Django (Redis, Memcached и т.п.).
+
+        Версии таблиц хранятся в том же кэше и увеличиваются через incr, поэтому
+        запись в одном процессе делает фрагменты таблицы недействительными для всех.
+
+        Свой бэкенд может быть любым объектом с асинхронными методами
+        get_version(table_name), bump_version(table_name), get(key) и set(key, html).
+
+        :param alias: Имя кэша в settings.CACHES.
+        :param timeout: Время жизни фрагмента в секундах (None — без ограничения).
+        """
+        from django.core.cache import caches
+
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    @staticmethod
+    def _version_key(table_name: str) -> str:
+        return f"fragment-version:{table_name}"
+
+    async def get_version(self, table_name: str) -> int:
+        return await self.cache.aget(self._version_key(table_name), 0)
+
+    async def bump_version(self, table_name: str):
+        key = self._version_key(table_name)
+        try:
+            await self.cache.aincr(key)
+        except ValueError:
+            # Ключа нет (или вытеснен): начинаем с 1, при гонке add не перезапишет чужое значение
+            if not await self.cache.aadd(key, 1, timeout=None):
+                await self.cache.aincr(key)
+
+    async def get(self, key: Hashable) -> Optional[str]:
+        return await self.cache.aget(self._fragment_key(key))
+
+    async def set(self, key: Hashable, html: str):
+        await self.cache.aset(self._fragment_key(key), html, timeout=self.timeout)
+
+    @staticmethod
+    def _fragment_key(key: Hashable) -> str:
+        return "fragment:" + hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+class FragmentCache:
+    def __init__(self, versions: TableVersions, max_size: int = 512, ttl: Optional[float] = 30.0,
+                 shared=None, router: Optional[ReplicaRouter] = None):
+        """
+        Кэш отрендеренных HTML-фрагментов представлений и сериализованных ответов JSON API.
+
+        Ключ — (шаблон, таблица, версия таблицы, вариант), где вариант — страница,
+        курсор, фильтры и прочие параметры запроса. Версия увеличивается каждой
+        записью и DDL в таблицу (PostgreModelEntity._after_write), поэтому
+        повторный просмотр неизменной таблицы не выполняет ни запросов, ни
+        рендеринга, а после записи фрагмент строится заново.
+
+        Первый уровень — LRU в памяти процесса с версиями TableVersions; TTL
+        ограничивает устаревание из-за записей других процессов. Второй
+        уровень (shared) — общий кэш с общими версиями таблиц.
+
+        :param versions: Версии таблиц (PostgreModelEntity.table_versions).
+        :param max_size: Максимальное количество фрагментов в памяти процесса.
+        :param ttl: Время жизни фрагмента в памяти процесса в секундах (None — без ограничения).
+        :param shared: Общий бэкенд, например DjangoCacheFragmentBackend, или None.
+        :param router: Маршрутизатор чтений (PostgreModelEntity.router). render читает
+                       с реплики, если у клиента не открыто окно read-your-writes; такой
+                       фрагмент таблицы, записанной в пределах этого окна, не кэшируется:
+                       реплика могла ещё не получить запись, сменившую версию.
+        """
+        self.versions = versions
+        self.local = ResultCache(max_size=max_size, ttl=ttl)
+        self.shared = shared
+        self.router = router
+        # Когда таблица последний раз менялась: запись в этом процессе или новая общая версия
+        self._changed_at: Dict[Optional[str], float] = {}
+        self._shared_versions: Dict[str, Tuple[int, float]] = {}
+        # Незавершенные увеличения общей версии: чтение после записи в этом процессе их дожидается
+        self._pending_bumps: Dict[str, asyncio.Task] = {}
+
+    def on_write(self, table_name: Optional[str]):
+        """Обработчик PostgreModelEntity.add_write_callback."""
+        self._changed_at[table_name] = time.monotonic()
+        if table_name is None:
+            self.local.clear()
+            return
+        if self.shared is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        previous = self._pending_bumps.get(table_name)
+        self._pending_bumps[table_name] = loop.create_task(self._bump_shared(table_name, previous))
+
+    async def _bump_shared(self, table_name: str, previous: Optional[asyncio.Task]):
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            await self.shared.bump_version(table_name)
+        except Exception as e:
+            logger.error(f"Ошибка обновления версии фрагментов {table_name}: {str(e)}")
+        finally:
+            if self._pending_bumps.get(table_name) is asyncio.current_task():
+                del self._pending_bumps[table_name]
+
+    def _observe_shared_version(self, table_name: str, version: int):
+        seen = self._shared_versions.get(table_name)
+        if seen is None or seen[0] != version:
+            # Запись другого процесса произошла не позже, чем мы увидели её версию
+            self._shared_versions[table_name] = (version, time.monotonic())
+
+    def _changed_recently(self, table_name: str) -> bool:
+        window = self.router.read_your_writes_window
+        changed_at = max(
+            self._changed_at.get(table_name, float("-inf")),
+            self._changed_at.get(None, float("-inf")),
+            self._shared_versions.get(table_name, (0, float("-inf")))[1],
+        )
+        return time.monotonic() - changed_at < window
+
+    async def get_or_render(self, template_name: str, table_name: str, variant: Hashable,
+                            render: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """
+        Возвращает фрагмент из кэша или строит его функцией render.
+
+        :param template_name: Имя шаблона.
+        :param table_name: Таблица, от данных которой зависит фрагмент.
+        :param variant: Остальные параметры, влияющие на фрагмент (страница, фильтры).
+        :param render: Корутина без аргументов: читает данные и рендерит шаблон
+                       (None — данных нет, результат не кэшируется).
+        :return: HTML (или байты JSON) либо None.
+        """
+        local_key = (template_name, table_name, self.versions.get(table_name), variant)
+        html = self.local.get(local_key)
+        if html is not None:
+            return html
+
+        shared_key = None
+        if self.shared is not None:
+            try:
+                pending = self._pending_bumps.get(table_name)
+                if pending is not None:
+                    await asyncio.gather(pending, return_exceptions=True)
+                shared_version = await self.shared.get_version(table_name)
+                self._observe_shared_version(table_name, shared_version)
+                shared_key = (template_name, table_name, shared_version, variant)
+                html = await self.shared.get(shared_key)
+            except Exception as e:
+                logger.error(f"Ошибка чтения общего кэша фрагментов: {str(e)}")
+                shared_key = None
+            if html is not None:
+                self.local.set(local_key, html)
+                return html
+
+        # Версии прочитаны до рендеринга: запись во время рендеринга не даст сохранить устаревший фрагмент под новой версией
+        from_replica = self.router is not None and self.router.reads_from_replica()
+        html = await render()
+        if html is None:
+            return None
+        if from_replica and self._changed_recently(table_name):
+            return html
+        self.local.set(local_key, html)
+        if shared_key is not None:
+            try:
+                await self.shared.set(shared_key, html)
+            except Exception as e:
+                logger.error(f"Ошибка записи в общий кэш фрагментов: {str(e)}")
+        return html
@@ -0,0 +1,35 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...config import db_url_psql
+from ...database.PostgreSQL.database_postgreSQL import PostgreModelEntity
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет пустые created_at и делает колонку NOT NULL DEFAULT now() в таблицах сущностей, "
+        "созданных раньше (иначе такие строки не попадают в страницы с сортировкой по created_at)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("tables", nargs="*", help="Таблицы сущностей (по умолчанию — все с nullable created_at)")
+        parser.add_argument("--batch-size", type=int, default=10000, help="Строк в одной транзакции заполнения")
+
+    def handle(self, *args, **options):
+        asyncio.run(self._run(options))
+
+    async def _run(self, options):
+        pg = PostgreModelEntity(db_url_psql)
+        try:
+            tables = options["tables"] or await pg.list_nullable_created_at_tables()
+            for table_name in tables:
+                try:
+                    filled = await pg.backfill_created_at(table_name, batch_size=options["batch_size"])
+                except ValueError as e:
+                    raise CommandError(f"{table_name}: {e}")
+                self.stdout.write(f"{table_name}: заполнено строк {filled}")
+            if not tables:
+                self.stdout.write("Все таблицы уже содержат NOT NULL created_at")
+        finally:
+            await pg.engine.dispose()
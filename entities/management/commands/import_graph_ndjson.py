@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...database.ArangoDB import pool
+from ...database.ArangoDB.database_arango import ArangoModelEntity, OVERWRITE_MODES
+
+
+def iter_ndjson_chunks(path, chunk_size):
+    """Читает NDJSON-файл порциями по chunk_size документов (пустые строки пропускаются)."""
+    chunk = []
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                chunk.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise CommandError(f"{path}:{line_number}: неверный JSON: {e}")
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Загружает сущности и рёбра из NDJSON-файлов в ArangoDB пакетами"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entities", help="NDJSON-файл документов сущностей")
+        parser.add_argument("--edges", help="NDJSON-файл рёбер (_from, _to)")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Документов в одном запросе")
+        parser.add_argument(
+            "--overwrite-mode", choices=[mode for mode in OVERWRITE_MODES if mode],
+            help="Поведение при совпадении _key (по умолчанию — ошибка для документа)",
+        )
+
+    def handle(self, *args, **options):
+        if not options["entities"] and not options["edges"]:
+            raise CommandError("Укажите --entities и/или --edges")
+        asyncio.run(self._import(options))
+
+    async def _import(self, options):
+        model = ArangoModelEntity(pool)
+        try:
+            # Сначала вершины, чтобы рёбра ссылались на существующие документы
+            if options["entities"]:
+                await self._import_file(options["entities"], model.insert_many, options)
+            if options["edges"]:
+                await self._import_file(options["edges"], model.create_edges_many, options)
+        finally:
+            await pool.close_pool()
+
+    async def _import_file(self, path, insert, options):
+        chunk_size = options["chunk_size"]
+        inserted = failed = offset = 0
+        for chunk in iter_ndjson_chunks(path, chunk_size):
+            result = await insert(chunk, overwrite_mode=options["overwrite_mode"], chunk_size=chunk_size)
+            inserted += result["inserted"]
+            failed += len(result["errors"])
+            for error in result["errors"]:
+                self.stderr.write(f"{path}: документ {offset + error['index'] + 1}: {error['error']}")
+            offset += len(chunk)
+        self.stdout.write(f"{path}: загружено {inserted}, ошибок {failed}")
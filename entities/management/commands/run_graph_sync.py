@@ -0,0 +1,44 @@
+import asyncio
+import signal
+
+from django.core.management.base import BaseCommand
+
+from ...config import (
+    db_url_psql,
+    db_graph_sync_batch_size,
+    db_graph_sync_poll_interval,
+)
+from ...database.ArangoDB import pool
+from ...database.ArangoDB.database_arango import ArangoModelEntity
+from ...database.PostgreSQL.database_postgreSQL import PostgreModelEntity
+from ...database.graph_sync import GraphSync
+
+
+class Command(BaseCommand):
+    help = "Реплицирует вставки и обновления строк сущностей из Postgres в вершины ArangoDB (один процесс)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=db_graph_sync_batch_size)
+        parser.add_argument("--poll-interval", type=float, default=db_graph_sync_poll_interval)
+
+    def handle(self, *args, **options):
+        asyncio.run(self._run(options))
+
+    async def _run(self, options):
+        pg = PostgreModelEntity(db_url_psql)
+        sync = GraphSync(
+            pg, ArangoModelEntity(pool),
+            batch_size=options["batch_size"], poll_interval=options["poll_interval"],
+        )
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        self.stdout.write("Репликация в ArangoDB запущена")
+        try:
+            await sync.run(stop)
+        finally:
+            await pool.close_pool()
+            await pg.engine.dispose()
+        self.stdout.write("Репликация в ArangoDB остановлена")
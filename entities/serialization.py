@@ -0,0 +1,59 @@
+import json
+from typing import Any, Dict, List, Sequence
+
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Форматы строк в ответах JSON API: списки значений по строкам или массивы по колонкам
+ORIENTS = ("rows", "columns")
+
+
+def _default(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Сериализует данные в JSON.
+
+    Если установлен orjson, datetime, date, UUID, dict и list из JSONB-колонок
+    кодируются им напрямую; Decimal и прочие типы — строкой. Без orjson
+    используется json со сжатыми разделителями.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+def encode_rows(columns: Sequence[str], rows: List[Dict[str, Any]], orient: str = "rows") -> Any:
+    """
+    Приводит строки к компактному виду без повторения имен колонок.
+
+    :param columns: Имена колонок в порядке вывода.
+    :param rows: Строки-словари.
+    :param orient: "rows" — список списков значений, "columns" — словарь колонка -> список значений.
+    :return: Список или словарь, готовый к dumps.
+    """
+    if orient not in ORIENTS:
+        raise ValueError(f"Недопустимый формат строк: {orient}")
+    if orient == "columns":
+        return {column: [row.get(column) for row in rows] for column in columns}
+    return [[row.get(column) for column in columns] for row in rows]
+
+
+class JSONBytesResponse(HttpResponse):
+    def __init__(self, data: Any = None, content: bytes = None, **kwargs):
+        """
+        Ответ с JSON, сериализованным dumps (или готовыми байтами content).
+
+        :param data: Данные для сериализации.
+        :param content: Уже сериализованный JSON, например из кэша.
+        """
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=content if content is not None else dumps(data), **kwargs)
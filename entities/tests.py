@@ -0,0 +1,571 @@
+import asyncio
+import contextvars
+import json
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+from aioarango.collection import StandardCollection
+from aioarango.connection import BaseConnection
+from aioarango.database import StandardDatabase
+from aioarango.response import Response
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from .database.ArangoDB.adjacency import WAL_DOCUMENT, WAL_REMOVE, AdjacencyIndex
+from .database.ArangoDB.connection_pool_arango import ArangoDBPool
+from .database.ArangoDB.database_arango import ArangoModelEntity
+from .database.PostgreSQL.aggregation import (
+    build_aggregate_query, normalize_aggregation, parse_bucket_param, parse_metric_params
+)
+from .database.PostgreSQL.bulk_write import (
+    build_update_from_values, build_upsert, chunks, group_by_columns, update_params
+)
+from .database.PostgreSQL.database_postgreSQL import PostgreModelEntity
+from .database.PostgreSQL.pagination import (
+    DIRECTION_NEXT, DIRECTION_PREV, build_keyset_query, build_page, decode_cursor, encode_cursor
+)
+from .database.PostgreSQL.result_cache import ResultCache, TableVersions
+from .database.PostgreSQL.routing import ReplicaRouter
+from .database.PostgreSQL.partitioning import (
+    add_months, build_partition_ddl, month_start, months_range, parse_partition_month, timestamps_range
+)
+from .database.PostgreSQL.query_filters import (
+    build_where, normalize_filters, normalize_sort, parse_filter_params, parse_sort_params
+)
+from .database.PostgreSQL.schema_registry import SchemaRegistry
+from .database.PostgreSQL.statement_cache import StatementCache
+from .fragment_cache import FragmentCache
+from .views import LAST_WRITE_COOKIE, Logout, begin_read_routing, finish_read_routing
+
+
+class FakeArangoConnection:
+    """HTTP-соединение aioarango без сети: только то, что нужно разбору ответа."""
+
+    prep_bulk_err_response = BaseConnection.prep_bulk_err_response
+
+    @staticmethod
+    def serialize(body):
+        return json.dumps(body)
+
+
+class FakeExecutor:
+    """Исполнитель запросов aioarango: запоминает запрос и отвечает заданным телом."""
+
+    context = "default"
+
+    def __init__(self, body):
+        self.body = body
+        self.requests = []
+
+    async def execute(self, request, response_handler):
+        self.requests.append(request)
+        response = Response(request.method, request.endpoint, {}, 202, "Accepted", json.dumps(self.body))
+        response.body = self.body
+        response.is_success = True
+        return response_handler(response)
+
+
+class FakeDatabase:
+    def __init__(self, executor):
+        self.executor = executor
+
+    def collection(self, name):
+        return StandardCollection(FakeArangoConnection(), self.executor, name)
+
+
+class FakePool:
+    def __init__(self, database):
+        self.database = database
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.database
+
+
+class ArangoInsertManyTests(unittest.IsolatedAsyncioTestCase):
+    async def test_insert_many_sends_overwrite_mode(self):
+        executor = FakeExecutor([
+            {"_id": "enitities/1", "_key": "1", "_rev": "a"},
+            {"error": True, "errorNum": 1210, "errorMessage": "unique constraint violated"},
+        ])
+        model = ArangoModelEntity(FakePool(FakeDatabase(executor)))
+
+        result = await model.insert_many([{"_key": "1"}, {"_key": "2"}], overwrite_mode="update")
+
+        request = executor.requests[0]
+        self.assertEqual(request.endpoint, "/_api/document/enitities")
+        self.assertEqual(request.params["overwriteMode"], "update")
+        self.assertEqual(result["inserted"], 1)
+        self.assertEqual([error["index"] for error in result["errors"]], [1])
+
+    async def test_create_edges_many_without_overwrite_mode(self):
+        executor = FakeExecutor([{"_id": "edges/1", "_key": "1", "_rev": "a"}])
+        model = ArangoModelEntity(FakePool(FakeDatabase(executor)))
+
+        result = await model.create_edges_many([{"_from": "1", "_to": "2"}])
+
+        request = executor.requests[0]
+        self.assertNotIn("overwriteMode", request.params)
+        self.assertEqual(request.data[0]["_from"], "enitities/1")
+        self.assertEqual(result, {"inserted": 1, "errors": []})
+
+
+class AdjacencyIndexTailTests(unittest.IsolatedAsyncioTestCase):
+    async def test_refresh_applies_only_wal_changes(self):
+        wal = SimpleNamespace(tail=mock.AsyncMock(return_value={
+            "from_present": True, "check_more": False, "last_included": "20", "last_scanned": "20",
+            "content": [
+                {"type": WAL_DOCUMENT, "cuid": "h1",
+                 "data": {"_key": "e3", "_rev": "r3", "_from": "enitities/b", "_to": "enitities/d"}},
+                {"type": WAL_REMOVE, "cuid": "h1", "data": {"_key": "e1", "_rev": "r4"}},
+                {"type": WAL_DOCUMENT, "cuid": "other",
+                 "data": {"_key": "x", "_rev": "r5", "_from": "enitities/a", "_to": "enitities/z"}},
+            ],
+        }))
+        model = ArangoModelEntity(FakePool(SimpleNamespace(wal=wal)))
+        model._stream_query = mock.Mock(side_effect=AssertionError("полная загрузка не ожидалась"))
+        index = AdjacencyIndex(model)
+        index._add("e1", "r1", "enitities/a", "enitities/b")
+        index._add("e2", "r2", "enitities/a", "enitities/c")
+        index._refreshed_at, index._tick, index._collection_id = 0.0, "10", "h1"
+
+        stats = await index.refresh()
+
+        self.assertEqual(stats, {"added": 1, "updated": 0, "removed": 1})
+        self.assertEqual(wal.tail.await_args.kwargs["lower"], "10")
+        self.assertEqual(index._tick, "20")
+        self.assertEqual(index.lookup("enitities/a", 1, "outbound"), [{"id": "enitities/c", "depth": 1}])
+        self.assertEqual(index.lookup("enitities/b", 1, "outbound"), [{"id": "enitities/d", "depth": 1}])
+
+
+class DispatchTests(SimpleTestCase):
+    async def test_unsupported_method_returns_405(self):
+        request = RequestFactory().post("/logout/")
+        request.session = SimpleNamespace(session_key=None)
+
+        async def auser():
+            return AnonymousUser()
+
+        request.auser = auser
+        response = await Logout.as_view()(request)
+
+        self.assertEqual(response.status_code, 405)
+
+
+class UpsertConflictColumnsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_conflict_columns_without_unique_index_are_rejected(self):
+        model = PostgreModelEntity("postgresql+asyncpg://localhost/test")
+        model.get_columns_info = mock.AsyncMock(return_value={"id": "integer", "email": "text"})
+        model.has_unique_index = mock.AsyncMock(return_value=False)
+        model.get_session = mock.Mock(side_effect=AssertionError("запись не ожидалась"))
+
+        with self.assertRaisesRegex(ValueError, "уникального индекса"):
+            await model.upsert_many("app_entity_1", [{"email": "a@b.c"}], conflict_columns=["email"])
+        model.has_unique_index.assert_awaited_once_with("app_entity_1", ["email"])
+
+        await model.engine.dispose()
+
+
+class FragmentCacheReplicaTests(unittest.IsolatedAsyncioTestCase):
+    async def test_replica_render_after_write_is_not_cached(self):
+        versions = TableVersions()
+        router = ReplicaRouter(primary=object(), replicas=[object()], read_your_writes_window=5.0)
+        cache = FragmentCache(versions, router=router)
+        render = mock.AsyncMock(return_value="<table></table>")
+
+        # Запись другого клиента: чтения этого клиента идут на реплику, которая может отставать
+        versions.bump("app_entity_1")
+        cache.on_write("app_entity_1")
+        await cache.get_or_render("entity.html", "app_entity_1", 1, render)
+        await cache.get_or_render("entity.html", "app_entity_1", 1, render)
+        self.assertEqual(render.await_count, 2)
+
+        # Своя запись: окно read-your-writes открыто, фрагмент читается с основного сервера и кэшируется
+        PostgreModelEntity.begin_routing()
+        router.mark_write()
+        self.assertIs(router.read_session_factory(), router.primary)
+        await cache.get_or_render("entity.html", "app_entity_1", 1, render)
+        await cache.get_or_render("entity.html", "app_entity_1", 1, render)
+        self.assertEqual(render.await_count, 3)
+
+    async def test_replica_render_is_cached_without_recent_writes(self):
+        router = ReplicaRouter(primary=object(), replicas=[object()])
+        cache = FragmentCache(TableVersions(), router=router)
+        render = mock.AsyncMock(return_value="<table></table>")
+
+        await cache.get_or_render("entity.html", "app_entity_1", 1, render)
+        await cache.get_or_render("entity.html", "app_entity_1", 1, render)
+
+        self.assertEqual(render.await_count, 1)
+
+
+class ReadYourWritesTests(SimpleTestCase):
+    def test_read_after_write_goes_to_primary_in_another_worker(self):
+        # Два воркера: у каждого свой маршрутизатор, общего состояния нет
+        writer = ReplicaRouter(primary=object(), replicas=[object()], read_your_writes_window=5.0)
+        reader = ReplicaRouter(primary=object(), replicas=[object()], read_your_writes_window=5.0)
+
+        def write():
+            state = begin_read_routing(RequestFactory().post("/entity/add-record/"))
+            writer.mark_write()
+            return finish_read_routing(HttpResponse(), state)
+
+        def read(cookies):
+            request = RequestFactory().get("/entity/get-entity/")
+            request.COOKIES.update(cookies)
+            begin_read_routing(request)
+            return reader.read_session_factory()
+
+        response = contextvars.copy_context().run(write)
+        cookie = response.cookies[LAST_WRITE_COOKIE]
+
+        self.assertIs(contextvars.copy_context().run(read, {LAST_WRITE_COOKIE: cookie.value}), reader.primary)
+        self.assertIs(contextvars.copy_context().run(read, {}), reader.replicas[0])
+
+
+class SchemaRegistryListenerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_listener_is_not_retried_on_every_call(self):
+        registry = SchemaRegistry("postgresql://localhost/test", retry_interval=60.0)
+        connect = mock.AsyncMock(side_effect=OSError("connection refused"))
+        with mock.patch("asyncpg.connect", connect):
+            self.assertFalse(await registry.ensure_listener())
+            self.assertFalse(await registry.ensure_listener())
+        self.assertEqual(connect.await_count, 1)
+        self.assertIsNone(registry.get("app_entity_1"))
+
+
+class ArangoPoolShrinkTests(unittest.IsolatedAsyncioTestCase):
+    async def test_idle_connections_are_closed_without_further_releases(self):
+        # Настоящие StandardDatabase и ArangoClient: открытие соединения не обращается к серверу
+        pool = ArangoDBPool("test", "root", "", "127.0.0.1:8529", min_size=0,
+                            max_idle_time=0.05, reap_interval=0.02)
+        first = await pool.get_connection()
+        second = await pool.get_connection()
+        self.assertIsInstance(first, StandardDatabase)
+        sessions = [session for client in pool._clients.values() for session in client._sessions]
+        await pool.release_connection(first)
+        await pool.release_connection(second)
+        self.assertEqual(pool.size, 2)
+
+        with self.assertNoLogs("entities.database.ArangoDB.connection_pool_arango", "WARNING"):
+            await asyncio.sleep(0.2)
+
+        self.assertEqual(pool.size, 0)
+        self.assertEqual(pool._clients, {})
+        self.assertTrue(all(session.is_closed for session in sessions))
+        await pool.close_pool()
+
+
+class KeysetPaginationTests(unittest.TestCase):
+    def test_cursor_round_trip_keeps_datetime(self):
+        key = (datetime(2024, 5, 1, 12, 30), 42)
+        cursor = encode_cursor("created_at", key, DIRECTION_NEXT)
+
+        self.assertEqual(decode_cursor(cursor), {"order_by": "created_at", "key": key, "direction": DIRECTION_NEXT})
+        self.assertNotIn("=", cursor)
+
+    def test_invalid_cursors_are_rejected(self):
+        for cursor in (
+            "not-a-cursor!",
+            encode_cursor("name", (1,), DIRECTION_NEXT),
+            encode_cursor("created_at", (1,), DIRECTION_NEXT),
+            encode_cursor("id", (1,), "sideways"),
+        ):
+            with self.subTest(cursor=cursor), self.assertRaisesRegex(ValueError, "Некорректный курсор"):
+                decode_cursor(cursor)
+
+    def test_first_page_has_no_key_condition(self):
+        self.assertEqual(
+            build_keyset_query("app_entity_1", "id", None),
+            "SELECT * FROM app_entity_1  ORDER BY id ASC LIMIT :limit",
+        )
+
+    def test_next_page_compares_key_as_row(self):
+        query = build_keyset_query("app_entity_1", "created_at", DIRECTION_NEXT, where="status = :f0")
+
+        self.assertIn("WHERE (status = :f0) AND (created_at, id) > (:k0, :k1) AND created_at >= :k0", query)
+        self.assertTrue(query.endswith("ORDER BY created_at ASC, id ASC LIMIT :limit"))
+
+    def test_prev_page_reverses_order(self):
+        query = build_keyset_query("app_entity_1", "created_at", DIRECTION_PREV)
+
+        self.assertIn("(created_at, id) < (:k0, :k1) AND created_at <= :k0", query)
+        self.assertIn("ORDER BY created_at DESC, id DESC", query)
+
+    def test_build_page_restores_order_and_cursors(self):
+        rows = [{"id": 5}, {"id": 4}, {"id": 3}]
+        page = build_page(rows, 2, "id", DIRECTION_PREV)
+
+        self.assertEqual(page["rows"], [{"id": 4}, {"id": 5}])
+        self.assertEqual(decode_cursor(page["prev_cursor"])["key"], (4,))
+        self.assertEqual(decode_cursor(page["next_cursor"]), {"order_by": "id", "key": (5,), "direction": DIRECTION_NEXT})
+
+        last = build_page([{"id": 1}], 2, "id", None)
+        self.assertIsNone(last["next_cursor"])
+        self.assertIsNone(last["prev_cursor"])
+
+
+class StatementCacheTests(unittest.TestCase):
+    def test_same_shape_reuses_statement_built_from_sorted_columns(self):
+        cache = StatementCache()
+        build = mock.Mock(side_effect=lambda cols: f"INSERT INTO t ({', '.join(cols)})")
+
+        first = cache.get("t", "insert", ["name", "age"], build)
+        second = cache.get("t", "insert", ("age", "name"), build)
+
+        self.assertIs(first, second)
+        build.assert_called_once_with(("age", "name"))
+        self.assertEqual(first.text, "INSERT INTO t (age, name)")
+
+    def test_least_recently_used_statement_is_evicted(self):
+        cache = StatementCache(max_size=2)
+        cache.get("t", "select", ["a"], lambda cols: "SELECT a FROM t")
+        cache.get("t", "select", ["b"], lambda cols: "SELECT b FROM t")
+        cache.get("t", "select", ["a"], lambda cols: "unused")
+        cache.get("t", "select", ["c"], lambda cols: "SELECT c FROM t")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("t", "select", ["a"], lambda cols: "rebuilt").text, "SELECT a FROM t")
+        self.assertEqual(cache.get("t", "select", ["b"], lambda cols: "rebuilt").text, "rebuilt")
+
+    def test_invalidate_drops_only_one_table(self):
+        cache = StatementCache()
+        cache.get("t1", "select", [], lambda cols: "SELECT 1")
+        cache.get("t2", "select", [], lambda cols: "SELECT 2")
+
+        cache.invalidate("t1")
+        self.assertEqual(len(cache), 1)
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+
+class QueryFiltersTests(unittest.TestCase):
+    columns = {"age": "integer", "created_at": "timestamp without time zone", "data": "jsonb", "name": "text"}
+
+    def test_filters_are_coerced_sorted_and_rendered(self):
+        filters = normalize_filters(parse_filter_params([
+            "name:eq:a:b", "created_at:gte:2024-01-01T00:00:00", "age:gt:18", 'data:contains:{"vip": true}',
+        ]), self.columns)
+
+        self.assertEqual(filters, [
+            ("age", "gt", 18),
+            ("created_at", "gte", datetime(2024, 1, 1)),
+            ("data", "contains", '{"vip": true}'),
+            ("name", "eq", "a:b"),
+        ])
+        where, params = build_where(filters)
+        self.assertEqual(where, "age > :f0 AND created_at >= :f1 AND data @> CAST(:f2 AS JSONB) AND name = :f3")
+        self.assertEqual(params["f0"], 18)
+
+    def test_invalid_filters_are_rejected(self):
+        cases = [
+            ({"column": "missing", "op": "eq", "value": "1"}, "не существует"),
+            ({"column": "age", "op": "like", "value": "1"}, "Недопустимый оператор"),
+            ({"column": "name", "op": "contains", "value": "{}"}, "только к JSONB"),
+            ({"column": "age", "op": "eq", "value": "abc"}, "Некорректное значение"),
+            ({"column": "created_at", "op": "lt", "value": "вчера"}, "Некорректное значение"),
+            ({"column": "data", "op": "contains", "value": "{not json"}, "Некорректное значение"),
+        ]
+        for item, message in cases:
+            with self.subTest(item=item), self.assertRaisesRegex(ValueError, message):
+                normalize_filters([item], self.columns)
+
+    def test_malformed_filter_param_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Некорректный фильтр"):
+            parse_filter_params(["age:18"])
+
+    def test_sort_params(self):
+        sort = parse_sort_params(["-created_at", "", "name"])
+
+        self.assertEqual(sort, [("created_at", "desc"), ("name", "asc")])
+        self.assertEqual(normalize_sort(sort, self.columns), sort)
+        with self.assertRaisesRegex(ValueError, "не существует"):
+            normalize_sort([("missing", "asc")], self.columns)
+        with self.assertRaisesRegex(ValueError, "направление"):
+            normalize_sort([("name", "up")], self.columns)
+
+
+class AggregationTests(unittest.TestCase):
+    columns = {"amount": "numeric", "created_at": "timestamp without time zone", "status": "text"}
+
+    def test_grouped_query_by_column_and_interval(self):
+        group_by, bucket, metrics = normalize_aggregation(
+            self.columns, ["status"], parse_bucket_param("created_at:month"),
+            parse_metric_params(["count", "sum:amount"]),
+        )
+
+        self.assertEqual(
+            build_aggregate_query("app_entity_1", group_by, bucket, metrics, where="status = :f0"),
+            "SELECT status, date_trunc('month', created_at) AS bucket, count(*) AS count, sum(amount) AS sum_amount "
+            "FROM app_entity_1 WHERE status = :f0 GROUP BY 1, 2 ORDER BY 1, 2 LIMIT :limit",
+        )
+
+    def test_count_is_the_default_metric(self):
+        self.assertEqual(normalize_aggregation(self.columns, None, None, None), ([], None, [("count", None)]))
+
+    def test_invalid_aggregations_are_rejected(self):
+        cases = [
+            (["missing"], None, None, "не существует"),
+            ([], ("status", "month"), None, "не является датой"),
+            ([], ("created_at", "decade"), None, "единица интервала"),
+            ([], None, [("median", "amount")], "агрегатная функция"),
+            ([], None, [("sum", None)], "требует колонку"),
+            ([], None, [("avg", "status")], "неприменима"),
+        ]
+        for group_by, bucket, metrics, message in cases:
+            with self.subTest(message=message), self.assertRaisesRegex(ValueError, message):
+                normalize_aggregation(self.columns, group_by, bucket, metrics)
+        with self.assertRaisesRegex(ValueError, "Некорректный интервал"):
+            parse_bucket_param("created_at")
+
+
+class ResultCacheTests(unittest.TestCase):
+    def test_table_version_bump_changes_the_key(self):
+        versions = TableVersions()
+        cache = ResultCache()
+        cache.set(("app_entity_1", versions.get("app_entity_1")), [1])
+
+        versions.bump("app_entity_1")
+
+        self.assertIsNone(cache.get(("app_entity_1", versions.get("app_entity_1"))))
+        self.assertEqual(versions.get("app_entity_2"), 0)
+
+    def test_expired_and_evicted_results(self):
+        cache = ResultCache(max_size=1, ttl=10.0)
+        with mock.patch("time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with mock.patch("time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+        cache.set("b", 2)
+        cache.set("c", 3)
+        self.assertEqual((cache.get("b"), cache.get("c")), (None, 3))
+
+
+class PartitioningTests(unittest.TestCase):
+    def test_month_arithmetic_crosses_years(self):
+        self.assertEqual(month_start(datetime(2024, 2, 29, 23, 59)), datetime(2024, 2, 1))
+        self.assertEqual(add_months(datetime(2024, 11, 1), 3), datetime(2025, 2, 1))
+        self.assertEqual(add_months(datetime(2024, 1, 1), -1), datetime(2023, 12, 1))
+        self.assertEqual(
+            months_range(datetime(2024, 11, 15), datetime(2025, 1, 2)),
+            [datetime(2024, 11, 1), datetime(2024, 12, 1), datetime(2025, 1, 1)],
+        )
+
+    def test_partition_bounds_cover_one_month(self):
+        self.assertEqual(
+            build_partition_ddl("app_entity_5", datetime(2024, 12, 1)),
+            "CREATE TABLE IF NOT EXISTS app_entity_5_p202412 PARTITION OF app_entity_5 "
+            "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')",
+        )
+        self.assertEqual(parse_partition_month("202412"), datetime(2024, 12, 1))
+        self.assertIsNone(parse_partition_month(None))
+
+    def test_timestamps_range_of_rows(self):
+        rows = [{"created_at": datetime(2024, 3, 5)}, {"created_at": datetime(2023, 7, 1)}]
+        self.assertEqual(timestamps_range(rows), (datetime(2023, 7, 1), datetime(2024, 3, 5)))
+
+        first, last = timestamps_range([{"name": "без даты"}])
+        self.assertEqual(first, last)
+        self.assertLess(abs((datetime.now() - first).total_seconds()), 60)
+
+
+class BulkWriteTests(unittest.TestCase):
+    def test_upsert_skips_unchanged_rows(self):
+        self.assertEqual(
+            build_upsert("app_entity_1", ["email", "name", "updated_at"], ["name"], ["email"], "updated_at"),
+            "INSERT INTO app_entity_1 (email, name, updated_at) VALUES (:email, :name, :updated_at) "
+            "ON CONFLICT (email) DO UPDATE SET name = EXCLUDED.name, updated_at = EXCLUDED.updated_at "
+            "WHERE ROW(app_entity_1.name) IS DISTINCT FROM ROW(EXCLUDED.name)",
+        )
+
+    def test_upsert_without_update_columns_does_nothing_on_conflict(self):
+        self.assertEqual(
+            build_upsert("app_entity_1", ["id"], [], ["id"]),
+            "INSERT INTO app_entity_1 (id) VALUES (:id) ON CONFLICT (id) DO NOTHING",
+        )
+
+    def test_update_from_values_casts_parameters(self):
+        query = build_update_from_values(
+            "app_entity_1", "id", ["age"], {"id": "integer", "age": "integer"}, 2, "updated_at"
+        )
+
+        self.assertEqual(
+            query,
+            "UPDATE app_entity_1 AS t SET age = v.age, updated_at = :touched_at "
+            "FROM (VALUES (CAST(:p0_0 AS integer), CAST(:p0_1 AS integer)), "
+            "(CAST(:p1_0 AS integer), CAST(:p1_1 AS integer))) AS v (id, age) "
+            "WHERE t.id = v.id AND ROW(t.age) IS DISTINCT FROM ROW(v.age)",
+        )
+        self.assertEqual(
+            update_params([{"id": 1, "age": 30}, {"id": 2, "age": 40}], "id", ["age"]),
+            {"p0_0": 1, "p0_1": 30, "p1_0": 2, "p1_1": 40},
+        )
+
+    def test_rows_grouped_by_column_set_and_chunked(self):
+        rows = [{"a": 1, "b": 2}, {"b": 3, "a": 4}, {"a": 5}]
+
+        self.assertEqual(group_by_columns(rows), {("a", "b"): rows[:2], ("a",): rows[2:]})
+        self.assertEqual(list(chunks(rows, 2)), [rows[:2], rows[2:]])
+
+
+class MemoryFragmentBackend:
+    """Общий кэш фрагментов в памяти с интерфейсом DjangoCacheFragmentBackend."""
+
+    def __init__(self):
+        self.versions = {}
+        self.fragments = {}
+
+    async def get_version(self, table_name):
+        return self.versions.get(table_name, 0)
+
+    async def bump_version(self, table_name):
+        self.versions[table_name] = self.versions.get(table_name, 0) + 1
+
+    async def get(self, key):
+        return self.fragments.get(key)
+
+    async def set(self, key, html):
+        self.fragments[key] = html
+
+
+class FragmentCacheVersionTests(unittest.IsolatedAsyncioTestCase):
+    async def test_table_version_bump_invalidates_only_that_table(self):
+        versions = TableVersions()
+        cache = FragmentCache(versions)
+        render = mock.AsyncMock(return_value="<table></table>")
+
+        await cache.get_or_render("entity.html", "app_entity_1", 1, render)
+        await cache.get_or_render("entity.html", "app_entity_2", 1, render)
+        await cache.get_or_render("entity.html", "app_entity_1", 1, render)
+        self.assertEqual(render.await_count, 2)
+
+        versions.bump("app_entity_1")
+        await cache.get_or_render("entity.html", "app_entity_1", 1, render)
+        await cache.get_or_render("entity.html", "app_entity_2", 1, render)
+        self.assertEqual(render.await_count, 3)
+
+        cache.on_write(None)
+        await cache.get_or_render("entity.html", "app_entity_2", 1, render)
+        self.assertEqual(render.await_count, 4)
+
+    async def test_shared_version_bump_from_another_process(self):
+        shared = MemoryFragmentBackend()
+        render = mock.AsyncMock(return_value="<table></table>")
+        first = FragmentCache(TableVersions(), shared=shared)
+        second = FragmentCache(TableVersions(), shared=shared)
+
+        await first.get_or_render("entity.html", "app_entity_1", 1, render)
+        await second.get_or_render("entity.html", "app_entity_1", 1, render)
+        self.assertEqual(render.await_count, 1)
+
+        # Запись в первом процессе увеличивает общую версию; второй процесс видит её после истечения своего LRU
+        first.on_write("app_entity_1")
+        await asyncio.gather(*first._pending_bumps.values())
+        self.assertEqual(shared.versions["app_entity_1"], 1)
+        second.local.clear()
+        await second.get_or_render("entity.html", "app_entity_1", 1, render)
+        self.assertEqual(render.await_count, 2)
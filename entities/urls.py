@@ -1,15 +1,26 @@
 from django.urls import path
-from .views import Entity, Login, Logout
+from .views import Entity, EntityApi, Login, Logout
 
 urlpatterns = [
     path('', Entity.IndexView.as_view(), name='index'),
     path('entity/create-group/', Entity.CreateGroup.as_view(), name='create_group'),
     path('entity/create-entity/', Entity.CreateEntity.as_view(), name='create_entity'),
     path('entity/get-entity/', Entity.GetEntityOne.as_view(), name='get_entity'),
+    path('entity/aggregate/', Entity.Aggregate.as_view(), name='aggregate_entity'),
+    path('entity/export/', Entity.Export.as_view(), name='export_entity'),
+    path('entity/search/', Entity.Search.as_view(), name='search_entities'),
     path('entity/manage/', Entity.Manage.as_view(), name='manage'),
+    path('entity/sql-stats/', Entity.SqlStats.as_view(), name='sql_stats'),
     path('entity/settings/', Entity.Settings.as_view(), name='settings'),
     path('entity/settings-entity/', Entity.SettingsEntity.as_view(), name='settings_entity'),
     path('entity/add-record/', Entity.AddRecord.as_view(), name='add_entity_record'),
+    path('entity/batch-records/', Entity.BatchRecords.as_view(), name='batch_entity_records'),
+
+    path('api/entities/', EntityApi.List.as_view(), name='api_entities'),
+    path('api/entities/<str:entity_id>/columns/', EntityApi.Columns.as_view(), name='api_entity_columns'),
+    path('api/entities/<str:entity_id>/rows/', EntityApi.Rows.as_view(), name='api_entity_rows'),
+    path('api/entities/<str:entity_id>/records/<int:record_id>/neighbors/', EntityApi.Neighbors.as_view(),
+         name='api_entity_neighbors'),
     
     path('login/', Login.as_view(), name='login'),
     path('logout/', Logout.as_view(), name='logout'),